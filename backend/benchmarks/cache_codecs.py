@@ -0,0 +1,169 @@
+"""
+Сравнение алгоритмов сжатия записей кэша по объёму и времени на данных из infra/data.
+
+Запуск из каталога backend: python benchmarks/cache_codecs.py
+"""
+import argparse
+import sys
+import timeit
+from functools import partial
+from pathlib import Path
+from statistics import mode
+from typing import Dict, List, Tuple, Union
+
+import orjson
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from db.cache import CODECS, CacheEntry
+from models.film import Film, FilmList
+from models.genre import GenreList
+from models.person import Person, PersonList
+
+DATA_DIR = Path(__file__).resolve().parents[2] / 'infra' / 'data'
+PAGE_SIZE = 100
+ROLES = (('actors', 'actor'), ('writers', 'writer'), ('director', 'director'))
+
+Entity = Union[Film, FilmList, GenreList, Person, PersonList]
+
+
+def read_docs(index: str) -> List[Dict]:
+    """
+    Чтение документов индекса из дампа Elasticsearch.
+
+    Args:
+        index: Название индекса
+
+    Returns:
+        List[Dict]: Список документов
+    """
+    with open(DATA_DIR / '{0}.json'.format(index), 'rb') as dump:
+        return [orjson.loads(line)['_source'] for line in dump if line.strip()]
+
+
+def get_film(movie: Dict, genres: Dict[str, str], persons: Dict[str, str]) -> Film:
+    """
+    Получение фильма с полной информацией так же, как его представляет API.
+
+    Args:
+        movie: Документ фильма
+        genres: ID жанров по названию
+        persons: ID персон по имени
+
+    Returns:
+        Film: Фильм
+    """
+    return Film(
+        uuid=movie['id'],
+        title=movie['title'],
+        imdb_rating=movie['imdb_rating'] or 0,
+        description=movie['description'] or '',
+        genre=[{'id': genres[name], 'name': name} for name in movie['genre'] if name in genres],
+        actors=movie['actors'],
+        writers=movie['writers'],
+        directors=[{'id': persons[name], 'name': name} for name in movie['director'] if name in persons],
+    )
+
+
+def get_credits(movies: List[Dict], persons: Dict[str, str]) -> Dict[str, List[tuple]]:
+    """
+    Получение ролей персон в фильмах, которые в документах хранятся объектами либо только именами.
+
+    Args:
+        movies: Документы фильмов
+        persons: ID персон по имени
+
+    Returns:
+        Dict[str, List[tuple]]: Пары из роли и ID фильма по ID персоны
+    """
+    credits: Dict[str, List[tuple]] = {}
+    for field, role in ROLES:
+        for movie in movies:
+            for person in movie[field]:
+                credits.setdefault(
+                    person['id'] if isinstance(person, dict) else persons.get(person, person),
+                    [],
+                ).append((role, movie['id']))
+    return credits
+
+
+def get_persons(movies: List[Dict], persons: Dict[str, str]) -> List[Person]:
+    """
+    Получение персон с основной ролью и фильмами так же, как их представляет API.
+
+    Args:
+        movies: Документы фильмов
+        persons: ID персон по имени
+
+    Returns:
+        List[Person]: Список персон
+    """
+    credits = get_credits(movies, persons)
+    return [
+        Person(
+            uuid=uuid,
+            full_name=name,
+            role=mode(credit[0] for credit in credits[uuid]),
+            film_ids=[credit[1] for credit in credits[uuid]],
+        )
+        for name, uuid in persons.items() if uuid in credits
+    ]
+
+
+def get_entities() -> List[Tuple[str, Entity]]:
+    """
+    Получение представлений данных кинотеатра, которые сохраняются в кэш.
+
+    Returns:
+        List[Tuple[str, Entity]]: Названия представлений и их модели
+    """
+    movies = sorted(read_docs('movies'), key=lambda movie: movie['imdb_rating'] or 0, reverse=True)
+    genres = read_docs('genres')
+    persons = {person['full_name']: person['id'] for person in read_docs('persons')}
+    films = [get_film(movie, {genre['name']: genre['id'] for genre in genres}, persons) for movie in movies]
+    person_list = sorted(get_persons(movies, persons), key=lambda person: len(person.film_ids), reverse=True)
+    return [
+        ('film', max(films, key=lambda film: len(film.actors) + len(film.writers))),
+        ('films page', FilmList.parse_obj([film.dict() for film in films[:PAGE_SIZE]])),
+        ('person', person_list[0]),
+        ('persons page', PersonList(__root__=person_list[:PAGE_SIZE])),
+        ('genres', GenreList.parse_obj([{'uuid': genre['id'], **genre} for genre in genres])),
+    ]
+
+
+def measure(name: str, model: Entity, number: int):
+    """
+    Вывод объёма и времени сериализации, сжатия и распаковки представления для каждого алгоритма.
+
+    Args:
+        name: Название представления
+        model: Модель представления
+        number: Количество повторений замера
+    """
+    serialize = timeit.timeit(model.json, number=number) / number
+    entry = CacheEntry.create(model.json().encode(), expire=0, delta=0)
+    for codec in CODECS:
+        raw = entry.pack(codec, min_size=0)
+        timings = [
+            timeit.timeit(func, number=number) / number
+            for func in (partial(entry.pack, codec, min_size=0), partial(CacheEntry.unpack, raw))
+        ]
+        print('{0:<14}{1:<6}{2:>10}{3:>12}{4:>12.1f}{5:>12.1f}{6:>12.1f}'.format(
+            name, codec, len(entry.data), len(raw), serialize * 1e6, timings[0] * 1e6, timings[1] * 1e6,
+        ))
+
+
+def main():
+    """Функция с основной логикой работы программы."""
+    parser = argparse.ArgumentParser(description='Сравнение алгоритмов сжатия записей кэша')
+    parser.add_argument('--number', type=int, default=1000, help='Количество повторений замера')
+    number = parser.parse_args().number
+    print('{0:<14}{1:<6}{2:>10}{3:>12}{4:>12}{5:>12}{6:>12}'.format(
+        'entity', 'codec', 'json, B', 'stored, B', 'json, us', 'pack, us', 'unpack, us',
+    ))
+    for name, model in get_entities():
+        measure(name, model, number)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+"""
+Доля попаданий в кеш со старыми ключами из параметров запроса как есть и с каноническими хешированными ключами.
+
+Запросы берутся из access-лога (`--log`), а без него генерируются по данным из infra/data: популярность
+фильмов и жанров распределена по закону Ципфа, а поиск и сортировка записываются клиентами по-разному.
+Ключи строятся теми же функциями-провайдерами и сервисами, что и в приложении; к базам данных замер не обращается.
+
+Запуск из каталога backend: python benchmarks/cache_keys.py [--log access.log]
+"""
+import argparse
+import asyncio
+import random
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, quote, urlsplit
+
+import orjson
+from elasticsearch import AsyncElasticsearch
+from redis.asyncio import Redis
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from api.v1 import base, films, persons
+from services.list import ListService
+
+DATA_DIR = Path(__file__).resolve().parents[2] / 'infra' / 'data'
+SORTS = ('-imdb_rating', 'imdb_rating:desc', 'imdb_rating:DESC', ' -imdb_rating', 'imdb_rating', 'imdb_rating:asc')
+SEARCH_PROVIDERS = {'/api/v1/films/search': films.get_film_search, '/api/v1/persons/search': persons.get_person_search}
+SEARCHES = ('{0}', '{0}', '{1}', '{2}', ' {0} ', '{3}')
+
+
+class Traffic:
+    """Класс генерации URL-адресов запросов к спискам и поиску фильмов и персон."""
+
+    def __init__(self, seed: int) -> None:
+        """
+        При инициализации класса читаются названия фильмов, имена персон и ID жанров из дампов Elasticsearch.
+
+        Args:
+            seed: Начальное значение генератора случайных чисел
+        """
+        self.random = random.Random(seed)  # noqa: S311
+        self.titles = self.load('movies.json', 'title')
+        self.names = self.load('persons.json', 'full_name')
+        self.genres = self.load('genres.json', 'id')
+
+    def load(self, filename: str, field: str) -> List[str]:
+        """
+        Чтение значений поля документов из дампа.
+
+        Args:
+            filename: Файл дампа
+            field: Поле документа
+
+        Returns:
+            List[str]: Значения поля
+        """
+        with open(DATA_DIR / filename, 'rb') as dump:
+            return [orjson.loads(line)['_source'][field] for line in dump if line.strip()]
+
+    def pick(self, choices: List[str]) -> str:
+        """
+        Выбор значения по закону Ципфа: чем раньше значение в списке, тем оно популярнее.
+
+        Args:
+            choices: Значения по убыванию популярности
+
+        Returns:
+            str: Значение
+        """
+        return choices[min(int(self.random.paretovariate(1)) - 1, len(choices) - 1)]
+
+    def spell(self, text: str) -> str:
+        """
+        Написание поискового запроса, как его мог бы ввести клиент.
+
+        Args:
+            text: Поисковый запрос
+
+        Returns:
+            str: Поисковый запрос в одном из написаний
+        """
+        variant = self.random.choice(SEARCHES)
+        return variant.format(text, text.lower(), text.upper(), '  '.join(text.split()))
+
+    def paths(self, count: int) -> Iterator[str]:
+        """
+        Генерация URL-адресов запросов: половина к главной странице, остальные к поиску и жанрам.
+
+        Args:
+            count: Количество запросов
+
+        Yields:
+            str: URL-адрес запроса
+        """
+        for _ in range(count):
+            sort, page = self.random.choice(SORTS), self.pick(['1', '2', '3', '4', '5'])
+            kind = self.random.randrange(10)
+            if kind < 5:
+                yield '/api/v1/films?sort={0}&page[number]={1}'.format(quote(sort), page)
+            elif kind < 7:
+                genre = self.pick(self.genres)
+                yield '/api/v1/films?filter[genre]={0}&sort={1}'.format(genre, quote(sort))
+            elif kind < 9:
+                yield '/api/v1/films/search?query={0}'.format(quote(self.spell(self.pick(self.titles))))
+            else:
+                yield '/api/v1/persons/search?query={0}'.format(quote(self.spell(self.pick(self.names))))
+
+
+class Keys:
+    """Класс ключей от данных в кеше для URL-адреса запроса."""
+
+    def __init__(self) -> None:
+        """При инициализации класса создаются клиенты баз данных, которые нужны сервисам, но не используются."""
+        self.database = base.Database(elastic=AsyncElasticsearch(), redis=Redis())
+
+    def get_service(self, path: str, params: Dict[str, str]) -> Optional[ListService]:
+        """
+        Создание сервиса функцией-провайдером маршрута.
+
+        Args:
+            path: Путь ресурса
+            params: Параметры запроса
+
+        Returns:
+            Optional[ListService]: Сервис либо None, если маршрут не учитывается
+        """
+        paginator = base.Paginator(page_number=int(params.get('page[number]', 1)), page_size=50)
+        cursor = base.Cursor(page_cursor=None)
+        if path == '/api/v1/films':
+            return films.get_film_list(
+                filter_genre=params.get('filter[genre]'),
+                sort=params.get('sort'),
+                paginator=paginator,
+                cursor=cursor,
+                database=self.database,
+            )
+        search = SEARCH_PROVIDERS.get(path)
+        if search is None:
+            return None
+        return search(query=params.get('query'), paginator=paginator, cursor=cursor, database=self.database)
+
+    def get_keys(self, url: str) -> Optional[List[str]]:
+        """
+        Получение старого и канонического ключей от данных в кеше.
+
+        Args:
+            url: URL-адрес запроса
+
+        Returns:
+            Optional[List[str]]: Старый и канонический ключи либо None, если маршрут не учитывается
+        """
+        parts = urlsplit(url)
+        params = {name: found[0] for name, found in parse_qs(parts.query, keep_blank_values=True).items()}
+        service = self.get_service(parts.path, params)
+        if service is None:
+            return None
+        return [get_legacy_key(service, params), service.redis_key]
+
+
+def get_legacy_key(service: ListService, params: Dict[str, str]) -> str:
+    """
+    Получение ключа, как до канонизации: из всех параметров сервиса в исходном написании, включая пустые.
+
+    Args:
+        service: Сервис списка
+        params: Параметры запроса
+
+    Returns:
+        str: Старый ключ от данных в кеше
+    """
+    raw = {
+        'filter': params.get('filter[genre]'),
+        'page_number': service.page_number,
+        'page_size': service.page_size,
+        'query': params.get('query'),
+        'sort': params.get('sort'),
+    }
+    legacy = '::'.join('{0}::{1}'.format(field, value) for field, value in raw.items())
+    return '{0}::{1}'.format(service.index, legacy)
+
+
+def get_hit_ratio(keys: List[str], size: int) -> float:
+    """
+    Доля попаданий в LRU-кеш заданного размера.
+
+    Args:
+        keys: Ключи запросов по порядку
+        size: Количество записей в кеше
+
+    Returns:
+        float: Доля попаданий
+    """
+    cache: Dict[str, bool] = {}
+    hits = 0
+    for key in keys:
+        hits += cache.pop(key, False)
+        cache[key] = True
+        if len(cache) > size:
+            cache.pop(next(iter(cache)))
+    return hits / len(keys) if keys else 0
+
+
+def read_paths(args: argparse.Namespace) -> Iterator[str]:
+    """
+    Получение URL-адресов запросов из access-лога либо из генератора.
+
+    Args:
+        args: Аргументы командной строки
+
+    Returns:
+        Iterator[str]: URL-адреса запросов
+    """
+    if args.log is None:
+        return Traffic(args.seed).paths(args.requests)
+    with open(args.log, encoding='utf-8') as log:
+        return iter([line.partition('GET ')[2].partition(' HTTP')[0] for line in log if 'GET ' in line])
+
+
+async def run(args: argparse.Namespace):
+    """
+    Подсчёт уникальных ключей и доли попаданий в кеш для старых и канонических ключей.
+
+    Args:
+        args: Аргументы командной строки
+    """
+    keys = Keys()
+    pairs = [pair for pair in map(keys.get_keys, read_paths(args)) if pair]
+    print('{0:<12}{1:>10}{2:>12}{3:>11}'.format('keys', 'distinct', 'max length', 'hit ratio'))
+    for name, column in (('legacy', 0), ('canonical', 1)):
+        column_keys = [pair[column] for pair in pairs]
+        print('{0:<12}{1:>10}{2:>12}{3:>11.2%}'.format(
+            name, len(set(column_keys)), max(map(len, column_keys), default=0), get_hit_ratio(column_keys, args.size),
+        ))
+    await keys.database.elastic.close()
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Разбор аргументов командной строки.
+
+    Returns:
+        argparse.Namespace: Аргументы командной строки
+    """
+    parser = argparse.ArgumentParser(description='Доля попаданий в кеш со старыми и каноническими ключами')
+    parser.add_argument('--log', help='Access-лог, из которого берутся запросы')
+    parser.add_argument('--requests', type=int, default=100000, help='Количество сгенерированных запросов')
+    parser.add_argument('--size', type=int, default=200, help='Количество записей в кеше')
+    parser.add_argument('--seed', type=int, default=0, help='Начальное значение генератора случайных чисел')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    asyncio.run(run(parse_args()))
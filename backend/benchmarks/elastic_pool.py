@@ -0,0 +1,177 @@
+"""
+Пропускная способность клиента Elasticsearch при разных размерах пула соединений и со сжатием HTTP.
+
+Вместо Elasticsearch запросы обслуживает локальный сервер aiohttp в отдельном процессе,
+который отвечает на `_search` с заданной задержкой документами фильмов из infra/data.
+
+Запуск из каталога backend: python benchmarks/elastic_pool.py
+"""
+import argparse
+import asyncio
+import multiprocessing
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import orjson
+from aiohttp import web
+from elasticsearch import AsyncElasticsearch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from db.elastic import KeepAliveConnection
+
+DATA_DIR = Path(__file__).resolve().parents[2] / 'infra' / 'data'
+HOST = '127.0.0.1'
+
+
+class StandIn:
+    """Класс локального сервера, который отвечает на любой запрос как Elasticsearch на `_search`."""
+
+    def __init__(self, docs: int, latency: float) -> None:
+        """
+        При инициализации класса готовится ответ с документами фильмов из дампа Elasticsearch.
+
+        Args:
+            docs: Количество документов в ответе
+            latency: Задержка ответа в секундах
+        """
+        with open(DATA_DIR / 'movies.json', 'rb') as dump:
+            hits = [orjson.loads(line) for line in dump if line.strip()][:docs]
+        self.body = orjson.dumps({'took': 1, 'timed_out': False, 'hits': {'total': {'value': docs}, 'hits': hits}})
+        self.latency = latency
+
+    async def search(self, request: web.Request) -> web.Response:
+        """
+        Ответ на запрос с задержкой и сжатием, если клиент его принимает.
+
+        Args:
+            request: Запрос клиента
+
+        Returns:
+            web.Response: Ответ с документами
+        """
+        await request.read()
+        await asyncio.sleep(self.latency)
+        response = web.Response(body=self.body, content_type='application/json')
+        response.enable_compression()
+        return response
+
+    def serve(self, port: int):
+        """
+        Запуск сервера на заданном порту.
+
+        Args:
+            port: Порт сервера
+        """
+        app = web.Application()
+        app.router.add_route('*', '/{tail:.*}', self.search)
+        web.run_app(app, host=HOST, port=port, print=None, access_log=None)
+
+
+def get_free_port() -> int:
+    """
+    Получение свободного порта для локального сервера.
+
+    Returns:
+        int: Номер порта
+    """
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+async def search(client: AsyncElasticsearch, semaphore: asyncio.Semaphore) -> float:
+    """
+    Выполнение поискового запроса, когда освободится место среди одновременных запросов.
+
+    Args:
+        client: Клиент Elasticsearch
+        semaphore: Ограничение количества одновременных запросов
+
+    Returns:
+        float: Задержка запроса в секундах
+    """
+    async with semaphore:
+        start = time.perf_counter()
+        await client.search(index='movies', body={'query': {'match_all': {}}})
+        return time.perf_counter() - start
+
+
+async def measure(port: int, maxsize: int, compress: bool, args: argparse.Namespace) -> Tuple[float, float]:
+    """
+    Выполнение запросов через клиент с заданным размером пула соединений.
+
+    Args:
+        port: Порт локального сервера
+        maxsize: Размер пула соединений
+        compress: Включено ли сжатие HTTP
+        args: Аргументы командной строки
+
+    Returns:
+        Tuple[float, float]: Запросов в секунду и средняя задержка запроса в миллисекундах
+    """
+    client = AsyncElasticsearch(
+        hosts=['{0}:{1}'.format(HOST, port)],
+        connection_class=KeepAliveConnection,
+        maxsize=maxsize,
+        http_compress=compress,
+        keepalive_timeout=60,
+        max_retries=10,
+    )
+    semaphore = asyncio.Semaphore(args.concurrency)
+    await client.search(index='movies')
+    start = time.perf_counter()
+    latencies: List[float] = await asyncio.gather(*[search(client, semaphore) for _ in range(args.requests)])
+    elapsed = time.perf_counter() - start
+    await client.close()
+    return args.requests / elapsed, sum(latencies) / len(latencies) * 1000
+
+
+async def run(port: int, args: argparse.Namespace):
+    """
+    Замер пропускной способности для каждого размера пула без сжатия и со сжатием HTTP.
+
+    Args:
+        port: Порт локального сервера
+        args: Аргументы командной строки
+    """
+    print('{0:>8}{1:>10}{2:>12}{3:>14}'.format('maxsize', 'compress', 'req/s', 'latency, ms'))
+    for maxsize in args.sizes:
+        for compress in (False, True):
+            rps, latency = await measure(port, maxsize, compress, args)
+            print('{0:>8}{1:>10}{2:>12.0f}{3:>14.1f}'.format(maxsize, str(compress), rps, latency))
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Разбор аргументов командной строки.
+
+    Returns:
+        argparse.Namespace: Аргументы командной строки
+    """
+    parser = argparse.ArgumentParser(description='Пропускная способность клиента Elasticsearch')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 5, 10, 25, 50], help='Размеры пула')
+    parser.add_argument('--requests', type=int, default=2000, help='Количество запросов')
+    parser.add_argument('--concurrency', type=int, default=100, help='Количество одновременных запросов')
+    parser.add_argument('--latency', type=float, default=20, help='Задержка ответа сервера в миллисекундах')
+    parser.add_argument('--docs', type=int, default=20, help='Количество документов в ответе')
+    return parser.parse_args()
+
+
+def main():
+    """Функция с основной логикой работы программы."""
+    args = parse_args()
+    port = get_free_port()
+    stand_in = StandIn(args.docs, args.latency / 1000)
+    server = multiprocessing.Process(target=stand_in.serve, args=(port,), daemon=True)
+    server.start()
+    print('Ответ: {0} документов, {1} байт, задержка {2} мс'.format(args.docs, len(stand_in.body), args.latency))
+    asyncio.run(run(port, args))
+    server.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""
+Пропускная способность приложения с управлением доступом через BaseHTTPMiddleware и через ASGI-middleware.
+
+Запросы передаются приложению напрямую, без сети, а маршруты вместо баз данных отвечают готовыми
+документами фильмов из infra/data, поэтому замер показывает накладные расходы самих middleware.
+
+Запуск из каталога backend: python benchmarks/middleware.py
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+import jwt
+import orjson
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp, Message
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from core.config import CONFIG
+from core.middleware import AccessControlMiddleware, RequestContextMiddleware
+
+DATA_DIR = Path(__file__).resolve().parents[2] / 'infra' / 'data'
+PATHS = ('/api/v1/films', '/api/v1/genres', '/api/v1/films/export')
+
+
+class LegacyAccessControl(BaseHTTPMiddleware):
+    """Класс управления доступом через BaseHTTPMiddleware, как при регистрации через `@app.middleware('http')`."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        При инициализации класса проверка доступа берётся из ASGI-middleware, чтобы сравнивать только обвязку.
+
+        Args:
+            app: ASGI-приложение
+        """
+        super().__init__(app)
+        self.guard = AccessControlMiddleware(app)
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        """
+        Обработка запроса, если к ресурсу есть доступ, иначе ответ с ошибкой.
+
+        Args:
+            request: Запрос клиента
+            call_next: Функция-обработчик запроса
+
+        Returns:
+            Response: Ответ сервера
+        """
+        if not CONFIG.fastapi.debug and request.scope['path'] not in self.guard.get_public_paths(request.scope):
+            response = self.guard.authorize(request.headers.get('authorization'))
+            if response is not None:
+                return response
+        return await call_next(request)
+
+
+class StandIn:
+    """Класс маршрутов, которые вместо баз данных отвечают готовыми документами фильмов."""
+
+    def __init__(self, docs: int) -> None:
+        """
+        При инициализации класса читаются документы фильмов из дампа Elasticsearch.
+
+        Args:
+            docs: Количество документов в ответе
+        """
+        with open(DATA_DIR / 'movies.json', 'rb') as dump:
+            hits = [orjson.loads(line) for line in dump if line.strip()][:docs]
+        self.docs = [hit['_source'] for hit in hits]
+        self.lines = [orjson.dumps(doc, option=orjson.OPT_APPEND_NEWLINE) for doc in self.docs]
+
+    async def page(self) -> Response:
+        """
+        Ответ страницей документов.
+
+        Returns:
+            Response: Ответ с документами
+        """
+        return ORJSONResponse(self.docs)
+
+    async def export(self) -> Response:
+        """
+        Потоковый ответ документами в формате NDJSON.
+
+        Returns:
+            Response: Потоковый ответ с документами
+        """
+        return StreamingResponse(iter(self.lines), media_type='application/x-ndjson')
+
+    async def metrics(self) -> Response:
+        """
+        Пустой ответ вместо метрик.
+
+        Returns:
+            Response: Ответ сервера
+        """
+        return Response()
+
+    def create_app(self, legacy: bool) -> FastAPI:
+        """
+        Создание приложения с маршрутами и middleware, как в основном приложении.
+
+        Args:
+            legacy: Подключить управление доступом через BaseHTTPMiddleware
+
+        Returns:
+            FastAPI: Приложение
+        """
+        app = FastAPI()
+        app.add_api_route(PATHS[0], self.page, name='films')
+        app.add_api_route(PATHS[1], self.page, name='genres')
+        app.add_api_route(PATHS[2], self.export, name='export')
+        app.add_api_route('/metrics', self.metrics, name='metrics')
+        app.add_middleware(LegacyAccessControl if legacy else AccessControlMiddleware)
+        app.add_middleware(RequestContextMiddleware)
+        return app
+
+
+class Exchange:
+    """Класс обмена сообщениями ASGI одного запроса, который передаётся приложению напрямую."""
+
+    def __init__(self, path: str, token: str) -> None:
+        """
+        При инициализации класса готовится ASGI-scope GET-запроса.
+
+        Args:
+            path: Путь ресурса
+            token: Токен доступа
+        """
+        self.scope = {
+            'type': 'http',
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'root_path': '',
+            'query_string': b'',
+            'headers': [(b'authorization', 'Bearer {0}'.format(token).encode())],
+            'server': ('testserver', 80),
+            'client': ('testclient', 50000),
+        }
+        self.received = False
+        self.status = 0
+
+    async def receive(self) -> Message:
+        """
+        Получение тела запроса, после которого клиент ждёт ответа, не отключаясь.
+
+        Returns:
+            Message: Сообщение ASGI с пустым телом запроса
+        """
+        if self.received:
+            await asyncio.Event().wait()
+        self.received = True
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(self, message: Message):
+        """
+        Получение сообщения ответа, из которого сохраняется код ответа.
+
+        Args:
+            message: Сообщение ASGI
+        """
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+
+    async def run(self, app: ASGIApp) -> int:
+        """
+        Выполнение запроса.
+
+        Args:
+            app: Приложение
+
+        Returns:
+            int: Код ответа
+        """
+        await app(self.scope, self.receive, self.send)
+        return self.status
+
+
+async def measure(app: ASGIApp, path: str, token: str, args: argparse.Namespace) -> float:
+    """
+    Выполнение запросов к ресурсу заданным количеством одновременных клиентов.
+
+    Args:
+        app: Приложение
+        path: Путь ресурса
+        token: Токен доступа
+        args: Аргументы командной строки
+
+    Returns:
+        float: Запросов в секунду
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    await Exchange(path, token).run(app)
+    start = loop.time()
+    await asyncio.gather(*[request(app, Exchange(path, token), semaphore) for _ in range(args.requests)])
+    return args.requests / (loop.time() - start)
+
+
+async def request(app: ASGIApp, exchange: Exchange, semaphore: asyncio.Semaphore):
+    """
+    Выполнение запроса, когда освободится место среди одновременных запросов.
+
+    Args:
+        app: Приложение
+        exchange: Обмен сообщениями запроса
+        semaphore: Ограничение количества одновременных запросов
+    """
+    async with semaphore:
+        await exchange.run(app)
+
+
+async def run(args: argparse.Namespace):
+    """
+    Замер пропускной способности каждого ресурса с обоими вариантами middleware.
+
+    Args:
+        args: Аргументы командной строки
+    """
+    stand_in = StandIn(args.docs)
+    token = jwt.encode({'sub': 'benchmark'}, CONFIG.fastapi.secret_key)
+    apps = {'BaseHTTP': stand_in.create_app(legacy=True), 'ASGI': stand_in.create_app(legacy=False)}
+    print('{0:<24}{1:>12}{2:>12}{3:>10}'.format('path', *apps, 'speedup'))
+    for path in PATHS:
+        rates = [await measure(app, path, token, args) for app in apps.values()]
+        print('{0:<24}{1:>12.0f}{2:>12.0f}{3:>9.2f}x'.format(path, *rates, rates[1] / rates[0]))
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Разбор аргументов командной строки.
+
+    Returns:
+        argparse.Namespace: Аргументы командной строки
+    """
+    parser = argparse.ArgumentParser(description='Пропускная способность приложения с разными middleware')
+    parser.add_argument('--requests', type=int, default=5000, help='Количество запросов')
+    parser.add_argument('--concurrency', type=int, default=50, help='Количество одновременных запросов')
+    parser.add_argument('--docs', type=int, default=20, help='Количество документов в ответе')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    asyncio.run(run(parse_args()))
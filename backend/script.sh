@@ -19,4 +19,7 @@ until elastic_ready; do
 done
 >&2 echo 'Elasticsearch is available.'
 
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 gunicorn main:app --bind 0.0.0.0:8000 -k uvicorn.workers.UvicornWorker
\ No newline at end of file
@@ -0,0 +1,42 @@
+import os
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest, multiprocess
+
+router = APIRouter()
+
+MULTIPROCESS_DIR_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+
+
+def get_registry() -> CollectorRegistry:
+    """
+    Функция для получения реестра метрик.
+
+    Если задан каталог `PROMETHEUS_MULTIPROC_DIR`, воркеры пишут метрики в его файлы,
+    и реестр собирает метрики всех воркеров, а не только того, который обрабатывает запрос.
+
+    Returns:
+        CollectorRegistry: Реестр метрик
+    """
+    if MULTIPROCESS_DIR_ENV not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def mark_process_dead():
+    """Функция для удаления файлов с текущими значениями метрик завершающегося воркера, чтобы они не учитывались."""
+    if MULTIPROCESS_DIR_ENV in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+@router.get('/metrics', include_in_schema=False)
+async def metrics() -> Response:
+    """
+    Метрики процесса в формате Prometheus.
+
+    Returns:
+        Response: Ответ сервера с метриками
+    """
+    return Response(generate_latest(get_registry()), media_type=CONTENT_TYPE_LATEST)
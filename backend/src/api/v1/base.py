@@ -1,11 +1,25 @@
-from aioredis import Redis
+import hashlib
+from http import HTTPStatus
+from typing import Optional
+
 from elasticsearch import AsyncElasticsearch
-from fastapi import Depends, Query
+from fastapi import Depends, Header, Query, Response
+from redis.asyncio import Redis
 
+from services.base import BaseService
+from services.cache import get_cache_key
+from core import context, tracing
+from core.config import CONFIG
 from db.elastic import get_elastic
 from db.redis import get_redis
 
 
+class CachedResponse(Response):
+    """Класс ответа с данными кинотеатра, уже сериализованными в JSON при сохранении в кеш."""
+
+    media_type = 'application/json'
+
+
 class Paginator:
     """Класс для получения запроса страницы."""
 
@@ -25,6 +39,25 @@ class Paginator:
         self.size = page_size
 
 
+class Cursor:
+    """Класс для получения курсора страницы при постраничном обходе по курсору."""
+
+    def __init__(
+        self,
+        page_cursor: Optional[str] = Query(
+            default=None, alias='page[cursor]',
+            description='Курсор страницы: пустой для первой, далее из заголовка X-Next-Cursor предыдущей страницы',
+        ),
+    ):
+        """
+        При инициализации класса принимает в запросе курсор страницы, который заменяет её номер.
+
+        Args:
+            page_cursor: Курсор страницы
+        """
+        self.value = page_cursor
+
+
 class Database:
     """Класс с зависимостями для работы с базами данных Elasticsearch и Redis."""
 
@@ -42,3 +75,76 @@ class Database:
         """
         self.redis = redis
         self.elastic = elastic
+
+
+class Conditional:
+    """
+    Класс для условных запросов: ответ 304, если у клиента уже есть актуальное представление.
+
+    Ответы ресурсов, доступных только с токеном, могут храниться лишь в кэше клиента.
+    """
+
+    cache_scope = 'private'
+
+    def __init__(self, if_none_match: Optional[str] = Header(default=None)):
+        """
+        При инициализации класса принимает в запросе ETag представлений, которые уже есть у клиента.
+
+        Значение `*` не поддерживается: ответ 304 на него отдавался бы до того, как известно, что представление есть.
+
+        Args:
+            if_none_match: Заголовок If-None-Match
+        """
+        etags = (etag.strip() for etag in (if_none_match or '').split(','))
+        self.etags = {etag[2:] if etag.startswith('W/') else etag for etag in etags if etag}
+
+    @tracing.traced('respond')
+    async def respond(self, service: BaseService) -> Response:
+        """
+        Ответ с представлением данных кинотеатра, его ETag и временем хранения у клиента.
+
+        ETag вычисляется по ключу от данных в кэше, в который входят версия схемы и поколение данных индексов,
+        поэтому ответ 304 отдаётся без обращения к кэшу и Elasticsearch.
+        Ответ с профилями запросов к Elasticsearch не кэшируется ни на сервере, ни у клиента.
+
+        Args:
+            service: Сервис для получения представления данных кинотеатра
+
+        Returns:
+            Response: Ответ 304 либо представление данных кинотеатра
+        """
+        if not service.cacheable or context.is_profiling():
+            return await self.respond_uncached(service)
+        key = await get_cache_key(service)
+        etag = '"{0}"'.format(hashlib.blake2b(key.encode(), digest_size=16).hexdigest())
+        headers = {
+            'ETag': 'W/{0}'.format(etag),
+            'Cache-Control': '{0}, max-age={1}'.format(
+                self.cache_scope,
+                min(CONFIG.cache.expire_in_seconds, CONFIG.cache.max_age_in_seconds),
+            ),
+        }
+        if etag in self.etags:
+            return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+        return CachedResponse(await service.get(), headers=headers)
+
+    async def respond_uncached(self, service: BaseService) -> Response:
+        """
+        Ответ с представлением, которое не хранится в кэше, и курсором следующей страницы, если она есть.
+
+        Args:
+            service: Сервис для получения представления данных кинотеатра
+
+        Returns:
+            Response: Представление данных кинотеатра
+        """
+        response = CachedResponse(await service.get(), headers={'Cache-Control': 'no-store'})
+        if service.next_cursor:
+            response.headers['X-Next-Cursor'] = service.next_cursor
+        return response
+
+
+class PublicConditional(Conditional):
+    """Класс для условных запросов к ресурсам, доступным без токена: их ответы могут храниться в общих кэшах."""
+
+    cache_scope = 'public'
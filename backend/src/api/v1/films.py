@@ -1,8 +1,10 @@
 from functools import lru_cache
+from uuid import UUID
 
 from fastapi import Depends, Path, Query
 
-from api.v1.base import Database, Paginator
+from api.v1.base import Cursor, Database, Paginator
+from services.export import ExportService
 from services.filters import FilterGenreFilms, QuerySearch
 from services.list import ListService
 from services.retrieve import RetrieveService
@@ -14,6 +16,7 @@ def get_film_list(
     filter_genre: str = Query(default=None, alias='filter[genre]', description='Фильтр по жанру'),
     sort: str = Query(default=None, description='Параметр сортировки'),
     paginator: Paginator = Depends(),
+    cursor: Cursor = Depends(),
     database: Database = Depends(),
 ) -> ListService:
     """
@@ -23,6 +26,7 @@ def get_film_list(
         filter_genre: Фильтр по жанру
         sort: Параметр сортировки
         paginator: Пагинатор
+        cursor: Курсор страницы
         database: Подключения к базам данных
 
     Returns:
@@ -32,7 +36,7 @@ def get_film_list(
         elastic=database.elastic, redis=database.redis,
         index='movies', model=FilmList,
         filter=FilterGenreFilms(genre_id=filter_genre),
-        page_size=paginator.size, page_number=paginator.page, sort=sort,
+        page_size=paginator.size, page_number=paginator.page, cursor=cursor.value, sort=sort,
     )
 
 
@@ -40,6 +44,7 @@ def get_film_list(
 def get_film_search(
     query: str = Query(default=None, description='Поисковый запрос'),
     paginator: Paginator = Depends(),
+    cursor: Cursor = Depends(),
     database: Database = Depends(),
 ) -> ListService:
     """
@@ -48,6 +53,7 @@ def get_film_search(
     Args:
         query: Поисковый запрос
         paginator: Пагинатор
+        cursor: Курсор страницы
         database: Подключения к базам данных
 
     Returns:
@@ -56,7 +62,7 @@ def get_film_search(
     return ListService(
         elastic=database.elastic, redis=database.redis,
         index='movies', model=FilmList,
-        page_size=paginator.size, page_number=paginator.page,
+        page_size=paginator.size, page_number=paginator.page, cursor=cursor.value,
         query=QuerySearch(q_string=query, fields=['title']),
     )
 
@@ -80,3 +86,24 @@ def get_film_details(
         elastic=database.elastic, redis=database.redis,
         index='movies', model=Film, id=film_id,
     )
+
+
+@lru_cache()
+def get_film_export(
+    after: UUID = Query(default=None, description='ID последнего полученного объекта, чтобы продолжить выгрузку'),
+    database: Database = Depends(),
+) -> ExportService:
+    """
+    Функция провайдер для ExportService, чтобы выгрузить все фильмов.
+
+    Args:
+        after: ID последнего объекта, полученного при прерванной выгрузке
+        database: Подключения к базам данных
+
+    Returns:
+        ExportService: Сервис для выгрузки всех объектов индекса
+    """
+    return ExportService(
+        elastic=database.elastic, redis=database.redis,
+        index='movies', model=FilmList, after=after,
+    )
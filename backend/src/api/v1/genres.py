@@ -3,8 +3,8 @@ from functools import lru_cache
 from fastapi import Depends, Path
 
 from api.v1.base import Database, Paginator
-from services.list import ListService
-from services.retrieve import RetrieveService
+from services.list import GenreListService, ListService
+from services.retrieve import GenreRetrieveService, RetrieveService
 from models.genre import Genre, GenreList
 
 
@@ -23,7 +23,7 @@ def get_genre_list(
     Returns:
         ListService: Сервис для получения списка объектов кинотеатра
     """
-    return ListService(
+    return GenreListService(
         elastic=database.elastic, redis=database.redis,
         index='genres', model=GenreList,
         page_size=paginator.size, page_number=paginator.page,
@@ -45,7 +45,7 @@ def get_genre_details(
     Returns:
         RetrieveService: Сервис для получения объекта кинотеатра по ID
     """
-    return RetrieveService(
+    return GenreRetrieveService(
         elastic=database.elastic, redis=database.redis,
         index='genres', model=Genre, id=genre_id,
     )
@@ -1,8 +1,10 @@
 from functools import lru_cache
+from uuid import UUID
 
 from fastapi import Depends, Path, Query
 
-from api.v1.base import Database, Paginator
+from api.v1.base import Cursor, Database, Paginator
+from services.export import ExportService
 from services.filters import FilterPersonFilms, QuerySearch
 from services.list import ListService
 from services.retrieve import RetrieveService
@@ -13,6 +15,7 @@ from models.person import Person, PersonList
 @lru_cache()
 def get_person_list(
     paginator: Paginator = Depends(),
+    cursor: Cursor = Depends(),
     database: Database = Depends(),
 ) -> ListService:
     """
@@ -20,6 +23,7 @@ def get_person_list(
 
     Args:
         paginator: Пагинатор
+        cursor: Курсор страницы
         database: Подключения к базам данных
 
     Returns:
@@ -28,7 +32,7 @@ def get_person_list(
     return ListService(
         elastic=database.elastic, redis=database.redis,
         index='persons', model=PersonList,
-        page_size=paginator.size, page_number=paginator.page,
+        page_size=paginator.size, page_number=paginator.page, cursor=cursor.value,
     )
 
 
@@ -36,6 +40,7 @@ def get_person_list(
 def get_person_search(
     query: str = Query(default=None, description='Поисковый запрос'),
     paginator: Paginator = Depends(),
+    cursor: Cursor = Depends(),
     database: Database = Depends(),
 ) -> ListService:
     """
@@ -44,6 +49,7 @@ def get_person_search(
     Args:
         query: Поисковый запрос
         paginator: Пагинатор
+        cursor: Курсор страницы
         database: Подключения к базам данных
 
     Returns:
@@ -52,7 +58,7 @@ def get_person_search(
     return ListService(
         elastic=database.elastic, redis=database.redis,
         index='persons', model=PersonList,
-        page_size=paginator.size, page_number=paginator.page,
+        page_size=paginator.size, page_number=paginator.page, cursor=cursor.value,
         query=QuerySearch(q_string=query, fields=['full_name']),
     )
 
@@ -98,3 +104,24 @@ def get_person_details(
         elastic=database.elastic, redis=database.redis,
         index='persons', model=Person, id=person_id,
     )
+
+
+@lru_cache()
+def get_person_export(
+    after: UUID = Query(default=None, description='ID последнего полученного объекта, чтобы продолжить выгрузку'),
+    database: Database = Depends(),
+) -> ExportService:
+    """
+    Функция провайдер для ExportService, чтобы выгрузить все персон.
+
+    Args:
+        after: ID последнего объекта, полученного при прерванной выгрузке
+        database: Подключения к базам данных
+
+    Returns:
+        ExportService: Сервис для выгрузки всех объектов индекса
+    """
+    return ExportService(
+        elastic=database.elastic, redis=database.redis,
+        index='persons', model=PersonList, after=after,
+    )
@@ -1,13 +1,16 @@
-from typing import List
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
 
-from fastapi import APIRouter, Depends
-
-from api.v1.films import get_film_details, get_film_list, get_film_search
+from api.v1.base import Conditional, PublicConditional
+from api.v1.films import get_film_details, get_film_export, get_film_list, get_film_search
 from api.v1.genres import get_genre_details, get_genre_list
-from api.v1.persons import get_person_details, get_person_films, get_person_list, get_person_search
-from models.film import Film, FilmList, FilmModified
+from api.v1.persons import (
+    get_person_details, get_person_export, get_person_films, get_person_list, get_person_search,
+)
+from models.film import Film, FilmList
 from models.genre import Genre, GenreList
 from models.person import Person, PersonList
+from services.export import ExportService
 from services.list import ListService
 from services.retrieve import RetrieveService
 
@@ -22,8 +25,10 @@ router = APIRouter()
     description='Популярные фильмы и фильтрация по жанрам',
     response_description='Название и рейтинг фильмов',
     tags=['films'])
-async def films(films_list: ListService = Depends(get_film_list)) -> List[FilmModified]:
-    return await films_list.get()
+async def films(
+    films_list: ListService = Depends(get_film_list), conditional: PublicConditional = Depends(),
+) -> Response:
+    return await conditional.respond(films_list)
 
 
 @router.get(
@@ -34,8 +39,23 @@ async def films(films_list: ListService = Depends(get_film_list)) -> List[FilmMo
     description='Полнотекстовый поиск по названиям фильмов',
     response_description='Название и рейтинг фильмов',
     tags=['films'])
-async def films_search(films_by_search: ListService = Depends(get_film_search)) -> List[FilmModified]:
-    return await films_by_search.get()
+async def films_search(
+    films_by_search: ListService = Depends(get_film_search), conditional: Conditional = Depends(),
+) -> Response:
+    return await conditional.respond(films_by_search)
+
+
+@router.get(
+    '/films/export',
+    response_class=StreamingResponse,
+    summary='Выгрузка фильмов',
+    description='Все фильмы по порядку ID; прерванную выгрузку можно продолжить с параметром after',
+    response_description='Строки NDJSON, по одному объекту в строке',
+    tags=['films'])
+async def films_export(film_export: ExportService = Depends(get_film_export)) -> Response:
+    return StreamingResponse(
+        film_export.stream(), media_type='application/x-ndjson', headers={'Cache-Control': 'no-store'},
+    )
 
 
 @router.get(
@@ -46,8 +66,10 @@ async def films_search(films_by_search: ListService = Depends(get_film_search))
     description='Полная информация по фильму',
     response_description='Название, описание, рейтинг, жанры и персонал фильмов',
     tags=['films'])
-async def films_pk(film_details: RetrieveService = Depends(get_film_details)) -> Film:
-    return await film_details.get()
+async def films_pk(
+    film_details: RetrieveService = Depends(get_film_details), conditional: Conditional = Depends(),
+) -> Response:
+    return await conditional.respond(film_details)
 
 
 @router.get(
@@ -58,8 +80,10 @@ async def films_pk(film_details: RetrieveService = Depends(get_film_details)) ->
     description='Список персон',
     response_description='Полное имя, основная роль, фильмы c участием персоны',
     tags=['persons'])
-async def persons(persons_list: ListService = Depends(get_person_list)) -> List[Person]:
-    return await persons_list.get()
+async def persons(
+    persons_list: ListService = Depends(get_person_list), conditional: Conditional = Depends(),
+) -> Response:
+    return await conditional.respond(persons_list)
 
 
 @router.get(
@@ -70,8 +94,23 @@ async def persons(persons_list: ListService = Depends(get_person_list)) -> List[
     description='Полнотекстовый поиск по именам персон',
     response_description='Полное имя, основная роль, фильмы c участием персоны',
     tags=['persons'])
-async def persons_search(persons_by_search: ListService = Depends(get_person_search)) -> List[Person]:
-    return await persons_by_search.get()
+async def persons_search(
+    persons_by_search: ListService = Depends(get_person_search), conditional: Conditional = Depends(),
+) -> Response:
+    return await conditional.respond(persons_by_search)
+
+
+@router.get(
+    '/persons/export',
+    response_class=StreamingResponse,
+    summary='Выгрузка персон',
+    description='Все персоны по порядку ID; прерванную выгрузку можно продолжить с параметром after',
+    response_description='Строки NDJSON, по одному объекту в строке',
+    tags=['persons'])
+async def persons_export(person_export: ExportService = Depends(get_person_export)) -> Response:
+    return StreamingResponse(
+        person_export.stream(), media_type='application/x-ndjson', headers={'Cache-Control': 'no-store'},
+    )
 
 
 @router.get(
@@ -82,8 +121,10 @@ async def persons_search(persons_by_search: ListService = Depends(get_person_sea
     description='Полная информация по персоне',
     response_description='Полное имя, основная роль, фильмы c участием персоны',
     tags=['persons'])
-async def persons_pk(person_details: RetrieveService = Depends(get_person_details)) -> Person:
-    return await person_details.get()
+async def persons_pk(
+    person_details: RetrieveService = Depends(get_person_details), conditional: Conditional = Depends(),
+) -> Response:
+    return await conditional.respond(person_details)
 
 
 @router.get(
@@ -94,8 +135,10 @@ async def persons_pk(person_details: RetrieveService = Depends(get_person_detail
     description='Фильмы персоны отсортированные по популярности',
     response_description='Название и рейтинг фильмов персоны',
     tags=['persons'])
-async def persons_pk_film(films_by_person: ListService = Depends(get_person_films)) -> List[FilmModified]:
-    return await films_by_person.get()
+async def persons_pk_film(
+    films_by_person: ListService = Depends(get_person_films), conditional: Conditional = Depends(),
+) -> Response:
+    return await conditional.respond(films_by_person)
 
 
 @router.get(
@@ -106,8 +149,10 @@ async def persons_pk_film(films_by_person: ListService = Depends(get_person_film
     description='Список жанров',
     response_description='Название и описание жанров',
     tags=['genres'])
-async def genres(genres_list: ListService = Depends(get_genre_list)) -> List[Genre]:
-    return await genres_list.get()
+async def genres(
+    genres_list: ListService = Depends(get_genre_list), conditional: Conditional = Depends(),
+) -> Response:
+    return await conditional.respond(genres_list)
 
 
 @router.get(
@@ -118,5 +163,7 @@ async def genres(genres_list: ListService = Depends(get_genre_list)) -> List[Gen
     description='Полная информация по жанру',
     response_description='Название и описание жанра',
     tags=['genres'])
-async def genres_pk(genre_details: RetrieveService = Depends(get_genre_details)) -> Genre:
-    return await genre_details.get()
+async def genres_pk(
+    genre_details: RetrieveService = Depends(get_genre_details), conditional: Conditional = Depends(),
+) -> Response:
+    return await conditional.respond(genre_details)
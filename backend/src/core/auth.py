@@ -0,0 +1,88 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+
+from core.config import CONFIG
+from core.metrics import AUTH_VERIFY_TIME, count_cache_request
+
+Claims = Dict[str, Any]
+
+
+def get_bearer_token(authorization: Optional[str]) -> Optional[str]:
+    """
+    Функция для получения токена доступа из заголовка Authorization.
+
+    Args:
+        authorization: Значение заголовка вида `Bearer <токен>`
+
+    Returns:
+        Optional[str]: Токен либо None, если заголовка нет или он другого вида
+    """
+    scheme, _, token = (authorization or '').partition(' ')
+    token = token.strip()
+    if scheme.lower() != 'bearer' or not token:
+        return None
+    return token
+
+
+class TokenCache:
+    """
+    Класс LRU-кэша проверенных токенов доступа, чтобы не проверять подпись токена при каждом запросе.
+
+    Хранятся не сами токены, а их хеши SHA-256 вместе с данными токена. Запись действует до истечения
+    срока токена, но не дольше заданного времени, чтобы смена секретного ключа вступала в силу.
+    """
+
+    def __init__(self, secret_key: str, max_entries: int, ttl: float) -> None:
+        """
+        При инициализации класса задаются ключ проверки подписи и ограничения кэша.
+
+        Args:
+            secret_key: Секретный ключ подписи HS256
+            max_entries: Максимальное количество записей
+            ttl: Максимальное время жизни записи в секундах
+        """
+        self.secret_key = secret_key
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: OrderedDict[bytes, Tuple[float, Claims]] = OrderedDict()
+
+    def verify(self, token: str) -> Claims:
+        """
+        Проверка токена: подпись проверяется, только если токена нет в кэше или срок его записи истёк.
+
+        Недействительный токен не кэшируется, а ошибка `jwt.InvalidTokenError` пробрасывается вызывающему.
+
+        Args:
+            token: Токен доступа
+
+        Returns:
+            Claims: Данные токена
+        """
+        digest = hashlib.sha256(token.encode()).digest()
+        entry = self.entries.get(digest)
+        if entry is not None and entry[0] > time.time():
+            count_cache_request('token', 'hit')
+            self.entries.move_to_end(digest)
+            return entry[1]
+        count_cache_request('token', 'miss')
+        self.entries.pop(digest, None)
+        with AUTH_VERIFY_TIME.time():
+            claims = jwt.decode(jwt=token, key=self.secret_key, algorithms=['HS256'])
+        expires_at = time.time() + self.ttl
+        if isinstance(claims.get('exp'), (int, float)):
+            expires_at = min(expires_at, claims['exp'])
+        self.entries[digest] = (expires_at, claims)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return claims
+
+
+tokens = TokenCache(
+    CONFIG.fastapi.secret_key,
+    max_entries=CONFIG.fastapi.token_cache_max_entries,
+    ttl=CONFIG.fastapi.token_cache_ttl_in_seconds,
+)
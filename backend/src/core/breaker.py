@@ -0,0 +1,114 @@
+import time
+from http import HTTPStatus
+from typing import Optional
+
+from fastapi import HTTPException
+
+from core.config import CONFIG
+from core.metrics import BREAKER_OPEN, BREAKER_REJECTED
+
+
+class BackendUnavailable(HTTPException):
+    """Ошибка недоступности базы данных: повторы не помогли либо запросы к ней временно не выполняются."""
+
+    def __init__(self, backend: str, retry_after: float) -> None:
+        """
+        При инициализации класса задаётся ответ 503 с временем, через которое стоит повторить запрос.
+
+        Args:
+            backend: Название базы данных
+            retry_after: Время в секундах, через которое стоит повторить запрос
+        """
+        super().__init__(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='Сервис временно недоступен',
+            headers={'Retry-After': str(max(1, round(retry_after)))},
+        )
+        self.backend = backend
+
+
+class CircuitBreaker:
+    """
+    Класс предохранителя, который после серии ошибок подряд на время перестаёт выполнять запросы к базе данных.
+
+    Когда время истекает, выполняется один пробный запрос: успешный закрывает предохранитель,
+    неуспешный снова открывает его. Так при недоступной базе данных запросы не копятся в ожидании таймаутов.
+    """
+
+    def __init__(self, backend: str, failure_threshold: int, reset_timeout: float) -> None:
+        """
+        При инициализации класса предохранитель закрыт.
+
+        Args:
+            backend: Название базы данных
+            failure_threshold: Количество ошибок подряд, после которого предохранитель открывается
+            reset_timeout: Время в секундах, после которого выполняется пробный запрос
+        """
+        self.backend = backend
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_at: Optional[float] = None
+
+    @property
+    def closed(self) -> bool:
+        """
+        Выполняются ли запросы к базе данных без ограничений.
+
+        Returns:
+            bool: True, если предохранитель закрыт
+        """
+        return self.opened_at is None
+
+    @property
+    def retry_after(self) -> float:
+        """
+        Время до пробного запроса.
+
+        Returns:
+            float: Время в секундах
+        """
+        if self.opened_at is None:
+            return 0
+        return max(0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def check(self):
+        """
+        Проверка, можно ли выполнить запрос: при открытом предохранителе пропускается только пробный запрос.
+
+        Raises:
+            BackendUnavailable: Если предохранитель открыт
+        """
+        if self.opened_at is None:
+            return
+        now = time.monotonic()
+        trial_due = self.trial_at is None or now - self.trial_at >= self.reset_timeout
+        if now - self.opened_at >= self.reset_timeout and trial_due:
+            self.trial_at = now
+            return
+        BREAKER_REJECTED.labels(backend=self.backend).inc()
+        raise BackendUnavailable(self.backend, self.retry_after or self.reset_timeout)
+
+    def record_success(self):
+        """Учёт успешного запроса, который закрывает предохранитель."""
+        self.failures = 0
+        self.opened_at = None
+        self.trial_at = None
+        BREAKER_OPEN.labels(backend=self.backend).set(0)
+
+    def record_failure(self):
+        """Учёт ошибки соединения, которая открывает предохранитель после серии ошибок или неудачной пробы."""
+        self.failures += 1
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+            self.trial_at = None
+            BREAKER_OPEN.labels(backend=self.backend).set(1)
+
+
+elastic_breaker = CircuitBreaker(
+    'elastic', failure_threshold=CONFIG.retry.breaker_failures, reset_timeout=CONFIG.retry.breaker_reset_in_seconds,
+)
+redis_breaker = CircuitBreaker(
+    'redis', failure_threshold=CONFIG.retry.breaker_failures, reset_timeout=CONFIG.retry.breaker_reset_in_seconds,
+)
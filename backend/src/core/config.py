@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import ClassVar, Union
+from typing import List, Union
 
 from pydantic import BaseSettings, Field
 
@@ -16,6 +16,11 @@ class RedisConfig(BaseSettings):
 
     host: str = '127.0.0.1'
     port: int = 6379
+    max_connections: int = 20
+    pool_timeout_in_seconds: float = 5
+    connect_timeout_in_seconds: float = 2
+    read_timeout_in_seconds: float = 5
+    health_check_interval_in_seconds: int = 30
 
 
 class ElasticConfig(BaseSettings):
@@ -23,6 +28,84 @@ class ElasticConfig(BaseSettings):
 
     host: str = '127.0.0.1'
     port: int = 9200
+    maxsize: int = 25
+    http_compress: bool = True
+    timeout_in_seconds: float = 10
+    max_retries: int = 0
+    retry_on_timeout: bool = False
+    keepalive_in_seconds: float = 60
+    pit_enabled: bool = True
+    pit_keep_alive: str = '1m'
+    pit_max_open: int = 100
+    export_batch_size: int = 500
+    slow_query_in_ms: float = 500
+    profile_enabled: bool = False
+    profile_header_max_bytes: int = 2048
+
+
+class CacheConfig(BaseSettings):
+    """Класс с настройками кэша данных в памяти процесса и вычисления данных при промахах кэша."""
+
+    memory_enabled: bool = True
+    memory_max_entries: int = 1000
+    memory_max_bytes: int = 64 * 1024 * 1024
+    memory_ttl_in_seconds: float = 5
+    lock_expire_in_seconds: float = 10
+    lock_poll_in_seconds: float = 0.05
+    wait_timeout_in_seconds: float = 15
+    flight_timeout_in_seconds: float = 30
+    stale_in_seconds: int = 60
+    expire_in_seconds: int = 6 * 60 * 60
+    max_age_in_seconds: int = 60
+    generation_ttl_in_seconds: float = 1
+    xfetch_beta: float = 1
+    codec: str = 'zstd'
+    compress_min_bytes: int = 1024
+
+
+class WarmupConfig(BaseSettings):
+    """Класс с настройками прогрева кэша при старте сервера и после инвалидации."""
+
+    enabled: bool = True
+    concurrency: int = 4
+    pages: int = 2
+    page_size: int = 50
+    sorts: List[str] = ['-imdb_rating']
+    films: int = 50
+    hot_specs: int = 200
+    hot_capacity: int = 2000
+    hot_sample_rate: float = 0.1
+    hot_member_max_bytes: int = 512
+
+
+class RetryConfig(BaseSettings):
+    """Класс с настройками повторов запросов к базам данных и предохранителей, которые их ограничивают."""
+
+    deadline_in_seconds: float = 2
+    start_sleep_in_seconds: float = 0.05
+    border_sleep_in_seconds: float = 0.5
+    breaker_failures: int = 5
+    breaker_reset_in_seconds: float = 10
+
+
+class LoggingConfig(BaseSettings):
+    """Класс с настройками записи логов в фоновом потоке."""
+
+    level: str = 'INFO'
+    queue_size: int = 10000
+    access_sample_rate: float = 1
+
+
+class TracingConfig(BaseSettings):
+    """Класс с настройками трассировки запросов OpenTelemetry."""
+
+    enabled: bool = False
+    service_name: str = 'movies-async-api'
+    exporter: str = 'otlp'
+    endpoint: str = 'http://localhost:4318/v1/traces'
+    file_path: str = 'traces.jsonl'
+    sample_ratio: float = 0.1
+    max_queue_size: int = 2048
 
 
 class LogstashConfig(BaseSettings):
@@ -40,8 +123,10 @@ class FastApiConfig(BaseSettings):
     debug: bool = False
     docs: str = 'openapi'
     secret_key: str = 'secret_key'
+    token_cache_max_entries: int = 10000
+    token_cache_ttl_in_seconds: float = 300
     project_name: str = 'Read-only API для онлайн-кинотеатра'
-    cache_expire_in_seconds: ClassVar[int] = 60
+    genres_refresh_in_seconds: int = 300
 
 
 class MainSettings(BaseSettings):
@@ -50,6 +135,11 @@ class MainSettings(BaseSettings):
     fastapi: FastApiConfig = Field(default_factory=FastApiConfig)
     elastic: ElasticConfig = Field(default_factory=ElasticConfig)
     redis: RedisConfig = Field(default_factory=RedisConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    warmup: WarmupConfig = Field(default_factory=WarmupConfig)
+    retry: RetryConfig = Field(default_factory=RetryConfig)
+    logging: LoggingConfig = Field(default_factory=LoggingConfig)
+    tracing: TracingConfig = Field(default_factory=TracingConfig)
     logstash: LogstashConfig = Field(default_factory=LogstashConfig)
 
 
@@ -0,0 +1,91 @@
+import time
+from contextvars import ContextVar
+from secrets import token_hex
+from typing import Counter, Dict, List, NamedTuple, Optional
+
+from starlette.routing import Match
+from starlette.types import Scope
+
+from core.config import CONFIG
+
+REQUEST_ID_HEADER = b'x-request-id'
+PROFILE_HEADER = b'x-debug-profile'
+
+
+class RequestContext(NamedTuple):
+    """
+    Контекст запроса, который доступен всему коду, выполняемому при его обработке.
+
+    В `calls` считаются обращения к базам данных, выполненные за время обработки запроса,
+    а в `profiles` собираются профили запросов к Elasticsearch, если клиент запросил их заголовком X-Debug-Profile.
+    """
+
+    request_id: str
+    method: str
+    route: str
+    started_at: float
+    calls: Counter[str]
+    profiles: Optional[List[Dict]]
+
+    @classmethod
+    def from_scope(cls, scope: Scope) -> 'RequestContext':
+        """
+        Создание контекста по запросу: ID берётся из заголовка X-Request-Id либо генерируется.
+
+        Args:
+            scope: ASGI-scope запроса
+
+        Returns:
+            RequestContext: Контекст запроса
+        """
+        headers = dict(scope['headers'])
+        return cls(
+            request_id=headers.get(REQUEST_ID_HEADER, b'').decode('latin-1') or token_hex(nbytes=16),
+            method=scope['method'],
+            route=get_route(scope),
+            started_at=time.perf_counter(),
+            calls=Counter(),
+            profiles=[] if CONFIG.elastic.profile_enabled and headers.get(PROFILE_HEADER) in {b'1', b'true'} else None,
+        )
+
+    @property
+    def elapsed_ms(self) -> float:
+        """
+        Время с начала обработки запроса.
+
+        Returns:
+            float: Время в миллисекундах
+        """
+        return (time.perf_counter() - self.started_at) * 1000
+
+
+request_context: ContextVar[Optional[RequestContext]] = ContextVar('request_context', default=None)
+
+
+def get_route(scope: Scope) -> str:
+    """
+    Функция для получения шаблона пути маршрута, который обработает запрос.
+
+    Args:
+        scope: ASGI-scope запроса
+
+    Returns:
+        str: Шаблон пути либо `-`, если маршрут не найден
+    """
+    app = scope.get('app')
+    for route in getattr(app, 'routes', ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return '-'
+
+
+def is_profiling() -> bool:
+    """
+    Функция для проверки, собираются ли профили запросов к Elasticsearch для текущего запроса.
+
+    Returns:
+        bool: Запрошены ли профили
+    """
+    context = request_context.get()
+    return context is not None and context.profiles is not None
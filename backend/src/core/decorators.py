@@ -1,36 +1,93 @@
+import asyncio
 import logging
+import random
 import time
 from functools import wraps
 from typing import Any, Callable
 
+from core.breaker import BackendUnavailable, CircuitBreaker
+from core.config import CONFIG
 
-def backoff(errors: tuple, start_sleep_time=0.1, factor=2, border_sleep_time=10) -> Callable:
+logger = logging.getLogger('app')
+
+
+async def pause_before_retry(breaker: CircuitBreaker, delay: float, give_up_at: float, error: Exception):
+    """
+    Учёт ошибки соединения и пауза перед повтором, если на повтор ещё есть время.
+
+    Args:
+        breaker: Предохранитель базы данных
+        delay: Граница паузы
+        give_up_at: Время по `time.monotonic`, после которого запрос не повторяется
+        error: Ошибка соединения
+
+    Raises:
+        BackendUnavailable: Если пауза не укладывается в общее время на запрос или предохранитель открылся
     """
-    Функция для повторного выполнения функции через некоторое время, если возникла ошибка.
+    breaker.record_failure()
+    pause = random.uniform(0, delay)  # noqa: S311
+    if not breaker.closed or time.monotonic() + pause >= give_up_at:
+        raise BackendUnavailable(breaker.backend, breaker.retry_after or pause) from error
+    logging.warning('Нет соединения с {0}: {1}! Повтор через {2:.3f} с.'.format(breaker.backend, error, pause))
+    await asyncio.sleep(pause)
+
+
+def backoff(errors: tuple, breaker: CircuitBreaker, deadline: float = CONFIG.retry.deadline_in_seconds) -> Callable:
+    """
+    Функция для повторного выполнения корутины через некоторое время, если возникла ошибка соединения.
+
+    Пауза перед повтором выбирается случайно от нуля до границы, которая удваивается с каждой попыткой
+    до `retry.border_sleep_in_seconds`, чтобы воркеры не повторяли запросы одновременно.
+    Повторы прекращаются, если пауза не укладывается в общее время на повторы или предохранитель открылся.
+    Сами попытки не прерываются: их время ограничивают таймауты клиентов базы данных, а отмена команды Redis
+    посреди ответа вернула бы в пул соединение с непрочитанным ответом.
 
     Args:
         errors: Ошибки, которые нужно обработать
-        start_sleep_time: Начальное время повтора
-        factor: Во сколько раз нужно увеличить время ожидания
-        border_sleep_time: Граничное время ожидания
+        breaker: Предохранитель базы данных
+        deadline: Время в секундах с начала первой попытки, после которого запрос не повторяется
 
     Returns:
         Callable: Декорируемая функция
     """
     def decorator(func) -> Callable:
         @wraps(func)
-        def wrapper(*args, **kwargs) -> Any:
-            delay = start_sleep_time
+        async def wrapper(*args, **kwargs) -> Any:
+            give_up_at = time.monotonic() + deadline
+            delay = CONFIG.retry.start_sleep_in_seconds
             while True:
+                breaker.check()
                 try:
-                    conn = func(*args, **kwargs)
-                except errors as message:
-                    logging.error('Нет соединения: {0}!'.format(message))
-                    if delay < border_sleep_time:
-                        delay *= factor
-                    logging.error('Повторное подключение через {0}.'.format(delay))
-                    time.sleep(delay)
+                    value = await func(*args, **kwargs)
+                except errors as exc:
+                    await pause_before_retry(breaker, delay, give_up_at, exc)
+                    delay = min(delay * 2, CONFIG.retry.border_sleep_in_seconds)
                 else:
-                    return conn
+                    breaker.record_success()
+                    return value
+        return wrapper
+    return decorator
+
+
+def timed(message: str) -> Callable:
+    """
+    Функция для измерения времени выполнения корутины и записи его в лог.
+
+    Args:
+        message: Сообщение для лога, в которое подставляются позиционные аргументы корутины
+
+    Returns:
+        Callable: Декорируемая функция
+    """
+    def decorator(func) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                logger.info('{0}: {1:.1f} мс.'.format(
+                    message.format(*args), (time.perf_counter() - start) * 1000,
+                ))
         return wrapper
     return decorator
@@ -1,24 +1,50 @@
 import logging
+import random
+from http import HTTPStatus
 from logging import config as logging_config
-from secrets import token_hex
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener
+from queue import Full, Queue
+from typing import List, Optional
 
 from core.config import CONFIG
+from core.context import request_context
+from core.metrics import LOG_DROPPED
 
 
-class RequestIdFilter(logging.Filter):
-    """Класс дополнительного фильтра сообщений лога для добавления к ним информации об ID запроса."""
+class RequestContextFilter(logging.Filter):
+    """Класс фильтра сообщений лога, который добавляет к ним ID запроса, маршрут и время с начала обработки."""
 
-    def __init__(self, request_id: Optional[str]):
-        """При инициализации класса ожидает ID запроса.
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Основной метод для добавлении в лог информации из контекста текущего запроса.
+
+        Args:
+            record: Обрабатываемая запись
+
+        Returns:
+            bool: Не нулевое значение для регистрации записи
+        """
+        context = request_context.get()
+        record.request_id = context.request_id if context else '-'
+        record.route = context.route if context else '-'
+        record.elapsed_ms = round(context.elapsed_ms, 1) if context else 0
+        return True
+
+
+class AccessSampleFilter(logging.Filter):
+    """Класс фильтра лога доступа, который пропускает только часть записей об успешных запросах."""
+
+    def __init__(self, rate: float) -> None:
+        """
+        При инициализации класса задаётся доля записей об успешных запросах, которые попадут в лог.
 
         Args:
-            request_id: Уникальный идентификатор запроса
+            rate: Доля записей от 0 до 1
         """
-        self.request_id = request_id or token_hex(nbytes=16)
+        super().__init__()
+        self.rate = rate
 
     def filter(self, record: logging.LogRecord) -> bool:
-        """Основной метод для добавлении в лог информации.
+        """Основной метод для выборки записей: записи об ошибках регистрируются всегда.
 
         Args:
             record: Обрабатываемая запись
@@ -26,16 +52,97 @@ class RequestIdFilter(logging.Filter):
         Returns:
             bool: Не нулевое значение для регистрации записи
         """
-        record.request_id = self.request_id
+        status_code = record.args[-1] if isinstance(record.args, tuple) and record.args else None
+        if isinstance(status_code, int) and status_code < HTTPStatus.BAD_REQUEST:
+            return random.random() < self.rate  # noqa: S311
         return True
 
 
-LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-LOG_DEFAULT_HANDLERS = ['console']
+class DrainingListener(QueueListener):
+    """Класс фонового потока, который передаёт записи из очереди обработчикам."""
+
+    def enqueue_sentinel(self):
+        """Признак остановки ждёт места в очереди, чтобы поток успел записать накопившиеся записи."""
+        self.queue.put(self._sentinel)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Класс обработчика, который ставит записи в ограниченную очередь, не дожидаясь их записи.
+
+    Запись в консоль и отправку в Logstash выполняет фоновый поток, поэтому логирование не задерживает
+    обработку запросов. Если очередь переполнена, запись отбрасывается и учитывается в метрике.
+    """
+
+    def __init__(self, handlers: List[logging.Handler], queue_size: int) -> None:
+        """
+        При инициализации класса запускается фоновый поток с обработчиками, которые записывают лог.
+
+        Args:
+            handlers: Обработчики в виде ссылок `cfg://handlers.<имя>` из конфигурации логирования
+            queue_size: Максимальное количество записей в очереди
+
+        Raises:
+            ValueError: Если обработчики ещё не созданы, чтобы dictConfig повторил создание позже
+        """
+        targets = [handlers[index] for index in range(len(handlers))]  # ссылки cfg:// разрешаются по индексу
+        if not all(isinstance(target, logging.Handler) for target in targets):
+            raise ValueError('target not configured yet')
+        super().__init__(Queue(maxsize=queue_size))
+        self.listener: Optional[QueueListener] = DrainingListener(self.queue, *targets, respect_handler_level=True)
+        self.listener.start()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Подготовка записи к постановке в очередь.
+
+        Очередь не покидает процесс, поэтому аргументы сообщения не объединяются с ним:
+        они нужны форматтеру лога доступа uvicorn.
+
+        Args:
+            record: Обрабатываемая запись
+
+        Returns:
+            logging.LogRecord: Запись без изменений
+        """
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        """
+        Постановка записи в очередь без ожидания.
+
+        Args:
+            record: Обрабатываемая запись
+        """
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            LOG_DROPPED.labels(handler=self.name).inc()
+
+    def close(self):
+        """Остановка фонового потока после записи накопившихся записей."""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        super().close()
+
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'
+ACCESS_FMT = "%(levelprefix)s [%(request_id)s] %(client_addr)s - '%(request_line)s' %(status_code)s %(elapsed_ms)s ms"
+LOG_DEFAULT_HANDLERS = ['queue_console']
 
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'filters': {
+        'request_context': {
+            '()': RequestContextFilter,
+        },
+        'access_sample': {
+            '()': AccessSampleFilter,
+            'rate': CONFIG.logging.access_sample_rate,
+        },
+    },
     'formatters': {
         'verbose': {
             'format': LOG_FORMAT,
@@ -47,12 +154,12 @@ LOGGING = {
         },
         'access': {
             '()': 'uvicorn.logging.AccessFormatter',
-            'fmt': "%(levelprefix)s %(client_addr)s - '%(request_line)s' %(status_code)s",
+            'fmt': ACCESS_FMT,
         },
     },
     'handlers': {
         'console': {
-            'level': 'DEBUG',
+            'level': CONFIG.logging.level,
             'class': 'logging.StreamHandler',
             'formatter': 'verbose',
         },
@@ -72,24 +179,42 @@ LOGGING = {
             'host': CONFIG.logstash.host,
             'port': CONFIG.logstash.port,
         },
+        'queue_access': {
+            '()': BoundedQueueHandler,
+            'handlers': ['cfg://handlers.access', 'cfg://handlers.logstash'],
+            'queue_size': CONFIG.logging.queue_size,
+            'filters': ['request_context', 'access_sample'],
+        },
+        'queue_console': {
+            '()': BoundedQueueHandler,
+            'handlers': ['cfg://handlers.console'],
+            'queue_size': CONFIG.logging.queue_size,
+            'filters': ['request_context'],
+        },
+        'queue_logstash': {
+            '()': BoundedQueueHandler,
+            'handlers': ['cfg://handlers.logstash'],
+            'queue_size': CONFIG.logging.queue_size,
+            'filters': ['request_context'],
+        },
     },
     'loggers': {
         'app': {
-            'handlers': ['logstash', 'console'],
+            'handlers': ['queue_logstash', 'queue_console'],
             'level': 'INFO',
         },
         'uvicorn.error': {
             'level': 'INFO',
-            'handlers': ['logstash'],
+            'handlers': ['queue_logstash'],
         },
         'uvicorn.access': {
-            'handlers': ['access', 'logstash'],
+            'handlers': ['queue_access'],
             'level': 'INFO',
             'propagate': False,
         },
     },
     'root': {
-        'level': 'INFO',
+        'level': CONFIG.logging.level,
         'formatter': 'verbose',
         'handlers': LOG_DEFAULT_HANDLERS,
     },
@@ -0,0 +1,79 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+from core.context import request_context
+
+CACHE_REQUESTS = Counter(
+    'cache_requests_total',
+    'Обращения к кэшу данных кинотеатра по уровням кэша и маршрутам',
+    ['tier', 'result', 'route'],
+)
+REDIS_POOL_WAIT = Histogram(
+    'redis_pool_wait_seconds',
+    'Время ожидания свободного соединения из пула Redis',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+REDIS_POOL_IN_USE = Gauge(
+    'redis_pool_connections_in_use',
+    'Соединения пула Redis, занятые выполнением команд',
+    multiprocess_mode='livesum',
+)
+BREAKER_OPEN = Gauge(
+    'circuit_breaker_open',
+    'Открыт ли предохранитель базы данных',
+    ['backend'],
+    multiprocess_mode='livemax',
+)
+BREAKER_REJECTED = Counter(
+    'circuit_breaker_rejected_total',
+    'Запросы к базе данных, не выполненные из-за открытого предохранителя',
+    ['backend'],
+)
+LOG_DROPPED = Counter(
+    'log_records_dropped_total',
+    'Записи лога, отброшенные из-за переполнения очереди',
+    ['handler'],
+)
+AUTH_VERIFY_TIME = Histogram(
+    'auth_token_verify_seconds',
+    'Время проверки подписи токена доступа',
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005),
+)
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Время обработки запросов по маршрутам',
+    ['method', 'route', 'status'],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight',
+    'Запросы, которые обрабатываются в данный момент',
+    multiprocess_mode='livesum',
+)
+ELASTIC_LATENCY = Histogram(
+    'elastic_request_duration_seconds',
+    'Время запросов к Elasticsearch по индексам и операциям',
+    ['index', 'operation'],
+)
+ELASTIC_CALLS = Histogram(
+    'elastic_calls_per_request',
+    'Количество запросов к Elasticsearch за время обработки запроса',
+    ['route'],
+    buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21),
+)
+REDIS_LATENCY = Histogram(
+    'redis_command_duration_seconds',
+    'Время выполнения команд и конвейеров команд Redis',
+    ['command'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+
+def count_cache_request(tier: str, outcome: str):
+    """
+    Учёт обращения к кэшу с маршрутом текущего запроса, чтобы считать долю попаданий по маршрутам.
+
+    Args:
+        tier: Уровень кэша
+        outcome: Результат обращения: `hit` или `miss`
+    """
+    context = request_context.get()
+    CACHE_REQUESTS.labels(tier=tier, result=outcome, route=context.route if context else '-').inc()
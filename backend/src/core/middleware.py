@@ -0,0 +1,314 @@
+import json
+import logging
+from http import HTTPStatus
+from typing import Optional, Set
+
+import jwt
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core import auth, tracing
+from core.config import CONFIG
+from core.context import RequestContext, request_context
+from core.metrics import ELASTIC_CALLS, REQUEST_LATENCY, REQUESTS_IN_FLIGHT
+
+
+class RequestContextMiddleware:
+    """Класс ASGI-middleware, который один раз за запрос сохраняет его контекст в контекстную переменную."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        При инициализации класса принимает приложение, которое обрабатывает запросы.
+
+        Args:
+            app: ASGI-приложение
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """
+        Обработка запроса с сохранённым контекстом.
+
+        Каждый запрос выполняется в своей задаче со своей копией контекста, поэтому сбрасывать переменную не нужно.
+
+        Args:
+            scope: ASGI-scope запроса
+            receive: Корутина получения сообщений от клиента
+            send: Корутина отправки сообщений клиенту
+        """
+        if scope['type'] == 'http':
+            request_context.set(RequestContext.from_scope(scope))
+        await self.app(scope, receive, send)
+
+
+class ResponseStatus:
+    """Класс отправки сообщений ответа, который запоминает код ответа."""
+
+    def __init__(self, send: Send) -> None:
+        """
+        При инициализации класса принимает корутину отправки сообщений клиенту.
+
+        Args:
+            send: Корутина отправки сообщений клиенту
+        """
+        self.send_message = send
+        self.status = HTTPStatus.INTERNAL_SERVER_ERROR
+
+    async def send(self, message: Message):
+        """
+        Отправка сообщения клиенту.
+
+        Args:
+            message: Сообщение ASGI
+        """
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+        await self.send_message(message)
+
+
+class MetricsMiddleware:
+    """Класс ASGI-middleware, который учитывает время обработки запросов и обращения к Elasticsearch."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        При инициализации класса принимает приложение, которое обрабатывает запросы.
+
+        Args:
+            app: ASGI-приложение
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """
+        Обработка запроса с учётом в метриках, в том числе запросов, завершившихся ошибкой.
+
+        Args:
+            scope: ASGI-scope запроса
+            receive: Корутина получения сообщений от клиента
+            send: Корутина отправки сообщений клиенту
+
+        Raises:
+            Exception: Исключение приложения, учтённое в метриках как ответ со статусом 500
+        """
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        response = ResponseStatus(send)
+        with REQUESTS_IN_FLIGHT.track_inprogress():
+            try:
+                await self.app(scope, receive, response.send)
+            except Exception:
+                self.observe(HTTPStatus.INTERNAL_SERVER_ERROR)
+                raise
+        self.observe(response.status)
+
+    def observe(self, status: int):
+        """
+        Учёт запроса по данным из его контекста.
+
+        Args:
+            status: Код ответа
+        """
+        context = request_context.get()
+        if context is None:
+            return
+        REQUEST_LATENCY.labels(method=context.method, route=context.route, status=int(status)).observe(
+            context.elapsed_ms / 1000,
+        )
+        ELASTIC_CALLS.labels(route=context.route).observe(context.calls['elastic'])
+
+
+class TracingMiddleware:
+    """Класс ASGI-middleware, который выполняет обработку запроса в корневом спане трассировки."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        При инициализации класса принимает приложение, которое обрабатывает запросы.
+
+        Args:
+            app: ASGI-приложение
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """
+        Обработка запроса в спане, который продолжает трассировку из заголовка traceparent, если он передан.
+
+        Время от начала этого спана до спана `respond` приходится на разбор параметров и зависимостей маршрута.
+
+        Args:
+            scope: ASGI-scope запроса
+            receive: Корутина получения сообщений от клиента
+            send: Корутина отправки сообщений клиенту
+        """
+        context = request_context.get()
+        if scope['type'] != 'http' or context is None:
+            await self.app(scope, receive, send)
+            return
+        response = ResponseStatus(send)
+        with tracing.start_server_span(
+            '{0} {1}'.format(context.method, context.route),
+            scope,
+            {'http.method': context.method, 'http.route': context.route, 'request.id': context.request_id},
+        ) as span:
+            await self.app(scope, receive, response.send)
+            tracing.end_server_span(span, int(response.status), {'elastic.calls': context.calls['elastic']})
+
+
+class ProfileSender:
+    """Класс отправки сообщений ответа, который добавляет к ответу профили запросов к Elasticsearch."""
+
+    def __init__(self, send: Send, context: RequestContext) -> None:
+        """
+        При инициализации класса принимает корутину отправки сообщений клиенту и контекст запроса.
+
+        Args:
+            send: Корутина отправки сообщений клиенту
+            context: Контекст запроса с профилями
+        """
+        self.send_message = send
+        self.context = context
+
+    async def send(self, message: Message):
+        """
+        Отправка сообщения клиенту с заголовком X-ES-Profile в начале ответа.
+
+        Args:
+            message: Сообщение ASGI
+        """
+        if message['type'] == 'http.response.start' and self.context.profiles:
+            headers = MutableHeaders(raw=message['headers'])
+            headers.append('X-ES-Profile', self.get_header())
+        await self.send_message(message)
+
+    def get_header(self) -> str:
+        """
+        Значение заголовка X-ES-Profile не длиннее `elastic.profile_header_max_bytes`.
+
+        Заголовки ответа должны поместиться в буфер nginx `proxy_buffer_size`, иначе клиент получит 502,
+        поэтому длинные профили записываются в лог, а в заголовке остаются только цель и время поисков,
+        сколько их поместится.
+
+        Returns:
+            str: Профили запросов в JSON
+        """
+        profiles = self.context.profiles or []
+        header = json.dumps(profiles, separators=(',', ':'))
+        if len(header) <= CONFIG.elastic.profile_header_max_bytes:
+            return header
+        logging.info('Профили запросов к Elasticsearch: {0}'.format(header))
+        summary = [{'target': profile['target'], 'took': profile['took']} for profile in profiles]
+        header = json.dumps(summary, separators=(',', ':'))
+        while len(header) > CONFIG.elastic.profile_header_max_bytes:
+            summary.pop()
+            header = json.dumps(summary, separators=(',', ':'))
+        return header
+
+
+class ProfileMiddleware:
+    """
+    Класс ASGI-middleware, который возвращает профили запросов к Elasticsearch в заголовке X-ES-Profile.
+
+    Профили собираются, только если это разрешено `elastic.profile_enabled`, а клиент передал `X-Debug-Profile: 1`.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        При инициализации класса принимает приложение, которое обрабатывает запросы.
+
+        Args:
+            app: ASGI-приложение
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """
+        Обработка запроса с добавлением профилей к ответу.
+
+        Args:
+            scope: ASGI-scope запроса
+            receive: Корутина получения сообщений от клиента
+            send: Корутина отправки сообщений клиенту
+        """
+        context = request_context.get()
+        if scope['type'] == 'http' and context and context.profiles is not None:
+            send = ProfileSender(send, context).send
+        await self.app(scope, receive, send)
+
+
+class AccessControlMiddleware:
+    """
+    Класс ASGI-middleware для управления доступом к ресурсам.
+
+    Без токена доступны документация, метрики и список фильмов, а в режиме отладки все ресурсы.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        При инициализации класса принимает приложение, которое обрабатывает запросы.
+
+        Args:
+            app: ASGI-приложение
+        """
+        self.app = app
+        self.public_paths: Optional[Set[str]] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """
+        Обработка запроса, если к ресурсу есть доступ, иначе ответ с ошибкой.
+
+        Args:
+            scope: ASGI-scope запроса
+            receive: Корутина получения сообщений от клиента
+            send: Корутина отправки сообщений клиенту
+        """
+        if scope['type'] == 'http' and not CONFIG.fastapi.debug and scope['path'] not in self.get_public_paths(scope):
+            response = self.authorize(Headers(scope=scope).get('authorization'))
+            if response is not None:
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+    def get_public_paths(self, scope: Scope) -> Set[str]:
+        """
+        Получение путей ресурсов, доступных без токена: они вычисляются один раз после подключения маршрутов.
+
+        Args:
+            scope: ASGI-scope запроса
+
+        Returns:
+            Set[str]: Пути ресурсов
+        """
+        if self.public_paths is None:
+            app = scope['app']
+            self.public_paths = {
+                app.docs_url,
+                f'{app.docs_url}/',
+                app.openapi_url,
+                app.url_path_for('metrics'),
+                app.url_path_for('films'),
+            }
+        return self.public_paths
+
+    def authorize(self, authorization: Optional[str]) -> Optional[Response]:
+        """
+        Проверка токена доступа из заголовка Authorization.
+
+        Args:
+            authorization: Значение заголовка
+
+        Returns:
+            Optional[Response]: Ответ с ошибкой либо None, если доступ разрешён
+        """
+        token = auth.get_bearer_token(authorization)
+        if token is None:
+            return Response('Доступ только авторизованным пользователям!', status_code=HTTPStatus.UNAUTHORIZED)
+        try:
+            auth.tokens.verify(token)
+        except jwt.ExpiredSignatureError:
+            return Response('Сессия устарела!', status_code=HTTPStatus.UNAUTHORIZED)
+        except Exception as exc:
+            logging.error('Проблема с авторизацией пользователей: {exc}!'.format(exc=exc))
+            return Response('Ведутся технические работы!', status_code=HTTPStatus.BAD_REQUEST)
+        return None
@@ -0,0 +1,172 @@
+import hashlib
+import logging
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import orjson
+
+from core.config import CONFIG
+
+logger = logging.getLogger('app')
+
+DESCRIPTION_LENGTH = 200
+MAX_QUERIES = 5
+NANOS_IN_MS = 10 ** 6
+
+
+class ElasticQuery(NamedTuple):
+    """Параметры и тело запроса к Elasticsearch, по которым находятся одинаковые запросы в логе."""
+
+    params: Optional[Dict]
+    body: Optional[Union[bytes, str]]
+
+    @classmethod
+    def from_arguments(cls, args: Tuple, kwargs: Dict) -> 'ElasticQuery':
+        """
+        Получение параметров и тела запроса из аргументов `perform_request`, переданных по порядку либо по имени.
+
+        Args:
+            args: Аргументы после метода и пути запроса
+            kwargs: Именованные аргументы
+
+        Returns:
+            ElasticQuery: Параметры и тело запроса
+        """
+        arguments = dict(zip(('params', 'body'), args), **kwargs)
+        return cls(params=arguments.get('params'), body=arguments.get('body'))
+
+    @property
+    def text(self) -> str:
+        """
+        Параметры и тело запроса одной строкой.
+
+        Returns:
+            str: Параметры и тело запроса
+        """
+        body = self.body.decode() if isinstance(self.body, bytes) else self.body
+        return '{0} {1}'.format(orjson.dumps(self.params or {}, option=orjson.OPT_SORT_KEYS).decode(), body or '')
+
+    @property
+    def digest(self) -> str:
+        """
+        Короткий хеш параметров и тела запроса.
+
+        Returns:
+            str: Хеш из 12 шестнадцатеричных цифр
+        """
+        return hashlib.blake2b(self.text.encode(), digest_size=6).hexdigest()
+
+
+def count_hits(response: Dict) -> int:
+    """
+    Функция для подсчёта найденных документов по ответу Elasticsearch, в том числе на `_msearch` и `_doc`.
+
+    Args:
+        response: Ответ Elasticsearch
+
+    Returns:
+        int: Количество найденных документов
+    """
+    found = response.get('found')
+    if found is not None:
+        return int(found)
+    return sum(
+        found.get('hits', {}).get('total', {}).get('value', 0) for found in response.get('responses', [response])
+    )
+
+
+def load_response(raw: str) -> Dict:
+    """
+    Функция для разбора тела ответа Elasticsearch, которое может быть пустым или не в JSON.
+
+    Args:
+        raw: Тело ответа
+
+    Returns:
+        Dict: Ответ Elasticsearch либо пустой словарь, если тело не объект JSON
+    """
+    try:
+        response = orjson.loads(raw) if raw else {}
+    except orjson.JSONDecodeError:
+        return {}
+    return response if isinstance(response, dict) else {}
+
+
+def log_slow_query(target: str, query: ElasticQuery, raw: str, elapsed_ms: float):
+    """
+    Функция для записи в лог запроса к Elasticsearch, который выполнялся дольше `elastic.slow_query_in_ms`.
+
+    В лог попадают хеш запроса, время выполнения в Elasticsearch, количество найденных документов
+    и объём ответа, а сам запрос с тем же хешем записывается на уровне DEBUG.
+
+    Args:
+        target: Индекс и операция запроса
+        query: Параметры и тело запроса
+        raw: Тело ответа
+        elapsed_ms: Время запроса в миллисекундах
+    """
+    if elapsed_ms < CONFIG.elastic.slow_query_in_ms:
+        return
+    response = load_response(raw)
+    digest = query.digest
+    logger.warning('Медленный запрос {0} {1}: {2:.1f} мс, took {3} мс, найдено {4}, ответ {5} байт.'.format(
+        target, digest, elapsed_ms, response.get('took', '-'), count_hits(response), len(raw or ''),
+    ))
+    logger.debug('Запрос {0}: {1}'.format(digest, query.text))
+
+
+def flatten_queries(queries: List[Dict], depth: int = 0) -> Iterator[Dict]:
+    """
+    Функция для обхода дерева запросов Lucene из профиля Elasticsearch.
+
+    Args:
+        queries: Запросы одного уровня дерева
+        depth: Глубина уровня
+
+    Yields:
+        Dict: Тип, описание и время запроса с разбивкой времени по этапам в миллисекундах
+    """
+    for query in queries:
+        yield {
+            'type': query['type'],
+            'description': query['description'][:DESCRIPTION_LENGTH],
+            'depth': depth,
+            'time_ms': query['time_in_nanos'] / NANOS_IN_MS,
+            'breakdown': {
+                stage: nanos / NANOS_IN_MS
+                for stage, nanos in query.get('breakdown', {}).items()
+                if nanos and not stage.endswith('_count')
+            },
+        }
+        yield from flatten_queries(query.get('children', []), depth + 1)
+
+
+def get_profiles(target: str, raw: str) -> List[Dict]:
+    """
+    Функция для получения краткого профиля запросов из ответа Elasticsearch на `_search` или `_msearch`.
+
+    Для каждого шарда остаются самые долгие запросы Lucene, чтобы профиль поместился в заголовок ответа.
+
+    Args:
+        target: Индекс и операция запроса
+        raw: Тело ответа
+
+    Returns:
+        List[Dict]: Профили поисков из ответа
+    """
+    responses = load_response(raw)
+    return [
+        {
+            'target': target,
+            'took': found.get('took'),
+            'shards': {
+                shard['id']: sorted(
+                    (query for search in shard['searches'] for query in flatten_queries(search['query'])),
+                    key=lambda query: query['time_ms'],
+                    reverse=True,
+                )[:MAX_QUERIES]
+                for shard in found['profile']['shards']
+            },
+        }
+        for found in responses.get('responses', [responses])
+        if 'profile' in found
+    ]
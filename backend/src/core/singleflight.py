@@ -0,0 +1,57 @@
+import asyncio
+from typing import Any, Callable, Coroutine, Dict
+
+
+class SingleFlight:
+    """Класс для объединения одновременных вычислений по одному ключу в одно в пределах процесса."""
+
+    def __init__(self) -> None:
+        """При инициализации класса нет ни одного выполняющегося вычисления."""
+        self.tasks: Dict[str, asyncio.Task] = {}
+
+    async def run(self, key: str, func: Callable[[], Coroutine], timeout: float) -> Any:
+        """
+        Получение результата вычисления по ключу, которое запускается, только если ещё не выполняется.
+
+        Вычисление выполняется в отдельной задаче, поэтому отмена одного из ожидающих его не прерывает.
+
+        Args:
+            key: Ключ вычисления
+            func: Корутина-функция вычисления
+            timeout: Время ожидания результата в секундах
+
+        Returns:
+            Any: Результат вычисления
+        """
+        return await asyncio.wait_for(asyncio.shield(self.start(key, func)), timeout)
+
+    def start(self, key: str, func: Callable[[], Coroutine]) -> asyncio.Task:
+        """
+        Запуск вычисления по ключу в фоне, если оно ещё не выполняется.
+
+        Args:
+            key: Ключ вычисления
+            func: Корутина-функция вычисления
+
+        Returns:
+            asyncio.Task: Задача вычисления
+        """
+        task = self.tasks.get(key)
+        if task is None:
+            task = asyncio.create_task(func())
+            self.tasks[key] = task
+            task.add_done_callback(lambda done: self.forget(key, done))
+        return task
+
+    def forget(self, key: str, task: asyncio.Task):
+        """
+        Удаление завершённого вычисления, чтобы следующий вызов запустил новое.
+
+        Args:
+            key: Ключ вычисления
+            task: Завершённая задача вычисления
+        """
+        if self.tasks.get(key) is task:
+            self.tasks.pop(key)
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,60 @@
+from opentelemetry import trace
+from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+from core.config import CONFIG
+
+
+def format_span(span: ReadableSpan) -> str:
+    """
+    Функция для записи спана в файл одной строкой JSON.
+
+    Args:
+        span: Завершённый спан
+
+    Returns:
+        str: Строка JSON с переводом строки
+    """
+    return '{0}\n'.format(span.to_json(indent=None))
+
+
+def get_exporter() -> SpanExporter:
+    """
+    Функция для создания экспортёра спанов: в коллектор по OTLP/HTTP либо в файл JSON Lines.
+
+    Returns:
+        SpanExporter: Экспортёр спанов
+    """
+    if CONFIG.tracing.exporter == 'file':
+        return ConsoleSpanExporter(
+            out=open(CONFIG.tracing.file_path, 'a', encoding='utf-8'),  # noqa: WPS515
+            formatter=format_span,
+        )
+    return OTLPSpanExporter(endpoint=CONFIG.tracing.endpoint)
+
+
+def start_tracing():
+    """
+    Функция для включения трассировки, если она разрешена в настройках.
+
+    Трассируется доля запросов `tracing.sample_ratio`, а запросы с заголовком traceparent
+    трассируются, если трассируется родительский спан. Спаны экспортируются пачками в фоновом потоке.
+    """
+    if not CONFIG.tracing.enabled:
+        return
+    provider = TracerProvider(
+        resource=Resource.create({SERVICE_NAME: CONFIG.tracing.service_name}),
+        sampler=ParentBased(TraceIdRatioBased(CONFIG.tracing.sample_ratio)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(get_exporter(), max_queue_size=CONFIG.tracing.max_queue_size))
+    trace.set_tracer_provider(provider)
+
+
+def stop_tracing():
+    """Функция для экспорта накопившихся спанов при выключении сервера."""
+    provider = trace.get_tracer_provider()
+    if isinstance(provider, TracerProvider):
+        provider.shutdown()
@@ -0,0 +1,136 @@
+from contextlib import contextmanager
+from functools import wraps
+from http import HTTPStatus
+from typing import Any, Callable, ContextManager, Dict, Iterator, Optional
+
+from opentelemetry import propagate, trace
+from opentelemetry.context import Context
+from opentelemetry.util.types import AttributeValue
+from starlette.types import Scope
+
+tracer = trace.get_tracer('movies-async-api')
+
+
+def extract_context(scope: Scope) -> Context:
+    """
+    Функция для получения родительского контекста трассировки из заголовков запроса.
+
+    Args:
+        scope: ASGI-scope запроса
+
+    Returns:
+        Context: Контекст трассировки
+    """
+    return propagate.extract({key.decode('latin-1'): value.decode('latin-1') for key, value in scope['headers']})
+
+
+def start_server_span(name: str, scope: Scope, attributes: Dict[str, AttributeValue]) -> ContextManager[trace.Span]:
+    """
+    Функция для создания корневого спана запроса, который продолжает трассировку из заголовка traceparent.
+
+    Args:
+        name: Название спана
+        scope: ASGI-scope запроса
+        attributes: Атрибуты спана
+
+    Returns:
+        ContextManager[trace.Span]: Контекстный менеджер текущего спана
+    """
+    return tracer.start_as_current_span(
+        name, context=extract_context(scope), kind=trace.SpanKind.SERVER, attributes=attributes,
+    )
+
+
+def end_server_span(span: trace.Span, status: int, attributes: Dict[str, AttributeValue]):
+    """
+    Функция для добавления к корневому спану кода ответа и итоговых атрибутов запроса.
+
+    Args:
+        span: Корневой спан запроса
+        status: Код ответа
+        attributes: Атрибуты спана
+    """
+    span.set_attributes({'http.status_code': status, **attributes})
+    if status >= HTTPStatus.INTERNAL_SERVER_ERROR:
+        span.set_status(trace.Status(trace.StatusCode.ERROR))
+
+
+@contextmanager
+def start_client_span(name: str, attributes: Dict[str, AttributeValue]) -> Iterator[trace.Span]:
+    """
+    Функция для создания спана обращения к базе данных.
+
+    Args:
+        name: Название спана
+        attributes: Атрибуты спана
+
+    Yields:
+        Span: Текущий спан
+
+    Raises:
+        Exception: Исключение из блока `with`, отмеченное в спане
+    """
+    with tracer.start_as_current_span(
+        name, kind=trace.SpanKind.CLIENT, attributes=attributes, record_exception=False, set_status_on_exception=False,
+    ) as span:
+        try:
+            yield span
+        except Exception as exc:
+            record_error(span, exc)
+            raise
+
+
+def record_error(span: trace.Span, exc: Exception):
+    """
+    Функция для отметки спана ошибкой, если исключение не означает ответ с кодом клиентской ошибки.
+
+    Ответы 4xx, например 404 на отсутствующий документ, являются обычным результатом запроса,
+    поэтому спаны с ними ошибкой не отмечаются.
+
+    Args:
+        span: Спан, в котором возникло исключение
+        exc: Исключение
+    """
+    status = getattr(exc, 'status_code', None)
+    if isinstance(status, int) and status < HTTPStatus.INTERNAL_SERVER_ERROR:
+        return
+    span.record_exception(exc)
+    span.set_status(trace.Status(trace.StatusCode.ERROR))
+
+
+def set_attributes(attributes: Dict[str, AttributeValue]):
+    """
+    Функция для добавления атрибутов к текущему спану.
+
+    Args:
+        attributes: Атрибуты спана
+    """
+    trace.get_current_span().set_attributes(attributes)
+
+
+def traced(name: str, attributes: Optional[Dict[str, AttributeValue]] = None) -> Callable:
+    """
+    Функция для выполнения корутины в отдельном спане.
+
+    Исключения с кодом клиентской ошибки, например HTTPException(404), не отмечают спан ошибкой.
+
+    Args:
+        name: Название спана
+        attributes: Атрибуты спана
+
+    Returns:
+        Callable: Декорируемая функция
+    """
+    def decorator(func) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            with tracer.start_as_current_span(
+                name, attributes=attributes, record_exception=False, set_status_on_exception=False,
+            ) as span:
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as exc:
+                    record_error(span, exc)
+                    raise
+        return wrapper
+    return decorator
@@ -0,0 +1,114 @@
+import math
+import random
+import struct
+import time
+import zlib
+from importlib import import_module, util
+from typing import Callable, Dict, NamedTuple, Optional
+
+lz4 = import_module('lz4.frame') if util.find_spec('lz4') else None
+zstandard = import_module('zstandard') if util.find_spec('zstandard') else None
+
+HEADER = struct.Struct('!BBdd')
+VERSION = 2
+
+
+class Codec(NamedTuple):
+    """Алгоритм сжатия данных записи кэша с кодом, который сохраняется в заголовке записи."""
+
+    code: int
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+CODECS: Dict[str, Codec] = {
+    'none': Codec(code=0, compress=bytes, decompress=bytes),
+    'zlib': Codec(code=1, compress=zlib.compress, decompress=zlib.decompress),
+}
+if zstandard:
+    CODECS['zstd'] = Codec(
+        code=2, compress=zstandard.ZstdCompressor().compress, decompress=zstandard.ZstdDecompressor().decompress,
+    )
+if lz4:
+    CODECS['lz4'] = Codec(code=3, compress=lz4.compress, decompress=lz4.decompress)
+
+DECODERS: Dict[int, Codec] = {codec.code: codec for codec in CODECS.values()}
+
+
+class CacheEntry(NamedTuple):
+    """Запись кэша с данными, временем их устаревания и временем, которое заняло их вычисление."""
+
+    data: bytes
+    stale_at: float
+    delta: float
+
+    @classmethod
+    def create(cls, data: bytes, expire: float, delta: float) -> 'CacheEntry':
+        """
+        Создание записи, которая будет свежей в течение заданного времени.
+
+        Args:
+            data: Данные записи
+            expire: Время в секундах, в течение которого данные считаются свежими
+            delta: Время вычисления данных в секундах
+
+        Returns:
+            CacheEntry: Запись кэша
+        """
+        return cls(data=data, stale_at=time.time() + expire, delta=delta)
+
+    @classmethod
+    def unpack(cls, raw: Optional[bytes]) -> Optional['CacheEntry']:
+        """
+        Восстановление записи из байтов, сохранённых в Redis, с распаковкой данных.
+
+        Args:
+            raw: Байты из Redis
+
+        Returns:
+            Optional[CacheEntry]: Запись либо None, если данных нет или они в другом формате
+        """
+        if not raw or raw[0] != VERSION:
+            return None
+        _, code, stale_at, delta = HEADER.unpack_from(raw)
+        codec = DECODERS.get(code)
+        if codec is None:
+            return None
+        return cls(data=codec.decompress(raw[HEADER.size:]), stale_at=stale_at, delta=delta)
+
+    def pack(self, codec: str, min_size: int) -> bytes:
+        """
+        Преобразование записи в байты для сохранения в Redis со сжатием данных от заданного объёма.
+
+        Сжатые данные сохраняются, только если они получились меньше исходных.
+        Недоступный алгоритм сжатия заменяется на zlib.
+
+        Args:
+            codec: Название алгоритма сжатия
+            min_size: Объём данных в байтах, начиная с которого они сжимаются
+
+        Returns:
+            bytes: Заголовок записи и данные
+        """
+        compression, data = CODECS['none'], self.data
+        if len(self.data) >= min_size:
+            compression = CODECS.get(codec, CODECS['zlib'])
+            data = compression.compress(self.data)
+        if len(data) >= len(self.data):
+            compression, data = CODECS['none'], self.data
+        return HEADER.pack(VERSION, compression.code, self.stale_at, self.delta) + data
+
+    def expiring(self, beta: float) -> bool:
+        """
+        Проверка, пора ли обновить запись: она устарела либо выпала вероятностная досрочная перепроверка.
+
+        Досрочное обновление (XFetch) тем вероятнее, чем ближе устаревание и чем дольше вычисление данных.
+
+        Args:
+            beta: Коэффициент досрочного обновления, 0 отключает его
+
+        Returns:
+            bool: Нужно ли обновить запись
+        """
+        early = -self.delta * beta * math.log(1 - random.random())  # noqa: S311
+        return time.time() + early >= self.stale_at
@@ -1,10 +1,9 @@
 import logging
 
-import aioredis
 from elasticsearch import AsyncElasticsearch, RequestError
 
 from core.config import CONFIG
-from db import elastic, redis
+from db import elastic, memory, redis
 
 SETTINGS = {
     'refresh_interval': '1s',
@@ -28,6 +27,11 @@ SETTINGS = {
         },
     },
 }
+PERSON_FILMS_PROPERTIES = {
+    'role': {'type': 'keyword'},
+    'film_ids': {'type': 'keyword'},
+    'films_count': {'type': 'integer'},
+}
 
 
 async def create_movies_index():
@@ -78,6 +82,7 @@ async def create_persons_index():
                     'properties': {
                         'id': {'type': 'keyword'},
                         'full_name': {'type': 'text', 'analyzer': 'ru_en', 'fields': {'raw': {'type': 'keyword'}}},
+                        **PERSON_FILMS_PROPERTIES,
                     },
                 },
             },
@@ -112,23 +117,45 @@ async def create_genres_index():
 
 
 async def start_elasticsearch():
-    """Корутина для подключение к базе данных Elasticsearch."""
+    """Корутина для подключение к базе данных Elasticsearch с пулом соединений и сжатием HTTP."""
     elastic.connection = AsyncElasticsearch(
         hosts=['{host}:{port}'.format(host=CONFIG.elastic.host, port=CONFIG.elastic.port)],
+        connection_class=elastic.MeteredConnection,
+        maxsize=CONFIG.elastic.maxsize,
+        http_compress=CONFIG.elastic.http_compress,
+        timeout=CONFIG.elastic.timeout_in_seconds,
+        max_retries=CONFIG.elastic.max_retries,
+        retry_on_timeout=CONFIG.elastic.retry_on_timeout,
+        keepalive_timeout=CONFIG.elastic.keepalive_in_seconds,
     )
 
 
 async def start_redis():
-    """Корутина для подключение к базе данных Redis."""
-    redis.connection = await aioredis.create_redis_pool(
-        address=(CONFIG.redis.host, CONFIG.redis.port), minsize=10, maxsize=20,
-    )
+    """Корутина для подключение к базе данных Redis через пул, в котором команды ждут свободное соединение."""
+    redis.connection = redis.MeteredRedis(connection_pool=redis.MeteredConnectionPool(
+        host=CONFIG.redis.host,
+        port=CONFIG.redis.port,
+        max_connections=CONFIG.redis.max_connections,
+        timeout=CONFIG.redis.pool_timeout_in_seconds,
+        socket_connect_timeout=CONFIG.redis.connect_timeout_in_seconds,
+        socket_timeout=CONFIG.redis.read_timeout_in_seconds,
+        health_check_interval=CONFIG.redis.health_check_interval_in_seconds,
+    ))
+
+
+def start_memory_cache():
+    """Функция для создания кэша данных в памяти процесса, если он включён."""
+    if CONFIG.cache.memory_enabled:
+        memory.cache = memory.MemoryCache(
+            max_entries=CONFIG.cache.memory_max_entries,
+            max_bytes=CONFIG.cache.memory_max_bytes,
+            ttl=CONFIG.cache.memory_ttl_in_seconds,
+        )
 
 
 async def stop_redis():
     """Корутина для отключения от базы данных Redis."""
-    redis.connection.close()
-    await redis.connection.wait_closed()
+    await redis.connection.close(close_connection_pool=True)
 
 
 async def stop_elasticsearch():
@@ -1,17 +1,161 @@
+import time
+from contextlib import asynccontextmanager
 from http import HTTPStatus
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from uuid import UUID
 
-from elasticsearch import AsyncElasticsearch, NotFoundError
-from elasticsearch.exceptions import ConnectionError
+import aiohttp
+from elasticsearch import AIOHttpConnection, AsyncElasticsearch, ConnectionError, NotFoundError, TransportError
 from fastapi import HTTPException
 
 from db.base import DatabaseModel
+from core import breaker, context, metrics, profiling, tracing
 from core.decorators import backoff
 
 connection: Optional[AsyncElasticsearch] = None
 
 
+class ElasticResponse(aiohttp.ClientResponse):
+    """Класс ответа Elasticsearch, тело которого декодируется так же, как в AIOHttpConnection."""
+
+    async def text(self, encoding: Optional[str] = None, errors: str = 'strict') -> str:
+        """
+        Получение тела ответа строкой: суррогатные пары в JSON не приводят к ошибке декодирования.
+
+        Args:
+            encoding: Кодировка, не используется: Elasticsearch отвечает в UTF-8
+            errors: Обработка ошибок декодирования, не используется
+
+        Returns:
+            str: Тело ответа
+        """
+        return (await self.read()).decode('utf-8', 'surrogatepass')
+
+
+class KeepAliveConnection(AIOHttpConnection):
+    """Класс HTTP-соединения с Elasticsearch, которое держит открытые TCP-соединения заданное время."""
+
+    def __init__(self, *args, keepalive_timeout: float = 15, **kwargs) -> None:
+        """
+        При инициализации класса помимо параметров соединения задаётся время жизни простаивающих TCP-соединений.
+
+        Args:
+            args: Позиционные аргументы AIOHttpConnection
+            keepalive_timeout: Время в секундах, в течение которого простаивающее TCP-соединение остаётся открытым
+            kwargs: Именованные аргументы AIOHttpConnection
+        """
+        super().__init__(*args, **kwargs)
+        self.keepalive_timeout = keepalive_timeout
+
+    async def _create_aiohttp_session(self):
+        """Создание сессии aiohttp с пулом TCP-соединений размера `maxsize` и заданным keep-alive."""
+        self.session = aiohttp.ClientSession(
+            headers=self.headers,
+            auto_decompress=True,
+            cookie_jar=aiohttp.DummyCookieJar(),
+            response_class=ElasticResponse,
+            connector=aiohttp.TCPConnector(
+                limit=self._limit,
+                use_dns_cache=True,
+                ssl=self._ssl_context,
+                keepalive_timeout=self.keepalive_timeout,
+            ),
+        )
+
+
+def get_elastic_operation(method: str, url: str) -> Tuple[str, str]:
+    """
+    Функция для получения индекса и операции запроса к Elasticsearch по его пути.
+
+    Args:
+        method: HTTP-метод запроса
+        url: Путь запроса, например `/movies/_search`
+
+    Returns:
+        Tuple[str, str]: Индекс либо `-`, если запрос не к индексу, и операция, например `search`
+    """
+    parts = url.strip('/').split('/')
+    index = '-'
+    if parts[0] and not parts[0].startswith('_'):
+        index = parts.pop(0)
+    operation = parts[0].lstrip('_') if parts and parts[0] else method.lower()
+    return index, operation
+
+
+def with_profile(body: Dict) -> Dict:
+    """
+    Функция для включения профилирования в тело поискового запроса, если клиент запросил профиль.
+
+    Args:
+        body: Тело запроса
+
+    Returns:
+        Dict: Тело запроса с `profile` либо исходное тело
+    """
+    if not context.is_profiling():
+        return body
+    return {**body, 'profile': True}
+
+
+class MeteredConnection(KeepAliveConnection):
+    """
+    Класс HTTP-соединения с Elasticsearch, которое измеряет время запросов и считает их в контексте запроса.
+
+    Запросы дольше `elastic.slow_query_in_ms` записываются в лог, в том числе завершившиеся ошибкой или таймаутом,
+    а профили поисковых запросов сохраняются в контекст запроса, если клиент их запросил.
+    """
+
+    async def perform_request(self, method: str, url: str, *args, **kwargs) -> Tuple[int, Dict, str]:
+        """
+        Выполнение запроса к Elasticsearch.
+
+        Args:
+            method: HTTP-метод запроса
+            url: Путь запроса
+            args: Параметры и тело запроса и другие аргументы AIOHttpConnection.perform_request
+            kwargs: Именованные аргументы AIOHttpConnection.perform_request
+
+        Returns:
+            Tuple[int, Dict, str]: Код, заголовки и тело ответа
+        """
+        request = context.request_context.get()
+        if request:
+            request.calls['elastic'] += 1
+        index, operation = get_elastic_operation(method, url)
+        started_at = time.perf_counter()
+        response: Tuple[int, Dict, str] = (0, {}, '')
+        with metrics.ELASTIC_LATENCY.labels(index=index, operation=operation).time():
+            with tracing.start_client_span(
+                'elasticsearch {0}'.format(operation),
+                {'db.system': 'elasticsearch', 'db.operation': operation, 'elasticsearch.index': index},
+            ):
+                try:  # noqa: WPS501
+                    response = await super().perform_request(method, url, *args, **kwargs)
+                finally:
+                    self.inspect(
+                        '{0}/{1}'.format(index, operation),
+                        profiling.ElasticQuery.from_arguments(args, kwargs),
+                        response[2],
+                        (time.perf_counter() - started_at) * 1000,
+                    )
+        return response
+
+    def inspect(self, target: str, query: profiling.ElasticQuery, raw: str, elapsed_ms: float):
+        """
+        Запись медленного запроса в лог и сохранение профиля поискового запроса в контекст запроса.
+
+        Args:
+            target: Индекс и операция запроса
+            query: Параметры и тело запроса
+            raw: Тело ответа
+            elapsed_ms: Время запроса в миллисекундах
+        """
+        profiling.log_slow_query(target, query, raw, elapsed_ms)
+        request = context.request_context.get()
+        if request and request.profiles is not None and target.endswith(('/search', '/msearch')):
+            request.profiles.extend(profiling.get_profiles(target, raw))
+
+
 async def get_elastic() -> AsyncElasticsearch:
     """
     Функция для объявления соединения с Elasticsearch, которая понадобится при внедрении зависимостей.
@@ -27,7 +171,8 @@ class ElasticStorage(DatabaseModel):
 
     elastic: AsyncElasticsearch
 
-    @backoff(errors=(ConnectionError))
+    @tracing.traced('elastic.get')
+    @backoff(errors=(ConnectionError,), breaker=breaker.elastic_breaker)
     async def get_elastic_doc(self, index: str, doc_id: UUID) -> Dict:
         """
         Получение документа из Elasticsearch.
@@ -42,13 +187,17 @@ class ElasticStorage(DatabaseModel):
         Returns:
             Dict: Данные документа без информации о результатах запроса
         """
+        tracing.set_attributes({'elasticsearch.index': index, 'elasticsearch.doc_id': str(doc_id)})
         try:
             doc = await self.elastic.get(index=index, id=doc_id)
         except NotFoundError:
+            tracing.set_attributes({'elasticsearch.found': False})
             raise HTTPException(status_code=HTTPStatus.NOT_FOUND)
+        tracing.set_attributes({'elasticsearch.found': True})
         return doc['_source']
 
-    @backoff(errors=(ConnectionError))
+    @tracing.traced('elastic.search')
+    @backoff(errors=(ConnectionError,), breaker=breaker.elastic_breaker)
     async def search_elastic_docs(self, index: str, queryset: Optional[Dict] = None) -> List[Dict]:
         """
         Получение списка документов из Elasticsearch.
@@ -63,8 +212,126 @@ class ElasticStorage(DatabaseModel):
         Returns:
             List[dict]: Список данных документов без информации о результатах запроса
         """
+        params = dict(queryset or {})
+        body = with_profile(params.pop('body', {}))
         try:
-            docs = await self.elastic.search(index=index, **queryset or {})
+            docs = await self.elastic.search(index=index, body=body or None, **params)
         except NotFoundError:
             raise HTTPException(status_code=HTTPStatus.NOT_FOUND)
+        tracing.set_attributes({'elasticsearch.index': index, 'elasticsearch.docs': len(docs['hits']['hits'])})
         return [doc['_source'] for doc in docs['hits']['hits']]
+
+    @tracing.traced('elastic.search_after')
+    @backoff(errors=(ConnectionError,), breaker=breaker.elastic_breaker)
+    async def search_elastic_hits(self, index: Optional[str], body: Dict) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Получение найденных документов Elasticsearch вместе со значениями их сортировки.
+
+        Args:
+            index: Индекс с документами либо None, если запрос выполняется в point-in-time
+            body: Тело запроса
+
+        Raises:
+            HTTPException: Если индекса или point-in-time нет, то отдаём HTTP-статус 404
+
+        Returns:
+            Tuple[List[Dict], Optional[str]]: Найденные документы и ID point-in-time, если запрос выполнялся в нём
+        """
+        try:
+            response = await self.elastic.search(index=index, body=with_profile(body))
+        except NotFoundError:
+            raise HTTPException(status_code=HTTPStatus.NOT_FOUND)
+        tracing.set_attributes({
+            'elasticsearch.index': index or '-',
+            'elasticsearch.docs': len(response['hits']['hits']),
+        })
+        return response['hits']['hits'], response.get('pit_id')
+
+    @backoff(errors=(ConnectionError,), breaker=breaker.elastic_breaker)
+    async def open_elastic_pit(self, index: str, keep_alive: str) -> str:
+        """
+        Открытие point-in-time, чтобы страницы одного обхода индекса читались из одного снимка данных.
+
+        Args:
+            index: Индекс с документами
+            keep_alive: Время жизни point-in-time между запросами, например `1m`
+
+        Returns:
+            str: ID point-in-time
+        """
+        response = await self.elastic.transport.perform_request(
+            'POST', '/{0}/_pit'.format(index), params={'keep_alive': keep_alive},
+        )
+        return response['id']
+
+    async def close_elastic_pit(self, pit_id: str):
+        """
+        Закрытие point-in-time, чтобы Elasticsearch не держал снимок данных до истечения его времени жизни.
+
+        Ошибки не пробрасываются: незакрытый point-in-time всё равно удалится по истечении времени жизни.
+
+        Args:
+            pit_id: ID point-in-time
+        """
+        try:
+            await self.elastic.transport.perform_request('DELETE', '/_pit', body={'id': pit_id})
+        except TransportError:
+            return
+
+    @asynccontextmanager
+    async def elastic_pit(self, index: str, keep_alive: str, enabled: bool) -> AsyncIterator[Optional[Dict]]:
+        """
+        Контекстный менеджер point-in-time, который закрывается при выходе из контекста.
+
+        ID point-in-time, полученный с очередной страницей, нужно сохранять в него же, чтобы закрылся актуальный.
+
+        Args:
+            index: Индекс с документами
+            keep_alive: Время жизни point-in-time между запросами, например `1m`
+            enabled: Открывать ли point-in-time
+
+        Yields:
+            Optional[Dict]: Point-in-time для тела запроса либо None, если он не открывался
+        """
+        pit = None
+        if enabled:
+            pit = {'id': await self.open_elastic_pit(index, keep_alive), 'keep_alive': keep_alive}
+        try:
+            yield pit
+        finally:
+            if pit:
+                await self.close_elastic_pit(pit['id'])
+
+    @tracing.traced('elastic.msearch')
+    @backoff(errors=(ConnectionError,), breaker=breaker.elastic_breaker)
+    async def msearch_elastic_docs(self, searches: List[Tuple[str, Dict]]) -> List[List[Dict]]:
+        """
+        Получение нескольких списков документов из Elasticsearch за один запрос `_msearch`.
+
+        Args:
+            searches: Пары из индекса и тела запроса для поиска данных
+
+        Raises:
+            HTTPException: Если индекса для одного из запросов нет, то отдаём HTTP-статус 404
+            TransportError: Если один из запросов завершился другой ошибкой
+
+        Returns:
+            List[List[dict]]: Списки данных документов в порядке переданных запросов
+        """
+        if not searches:
+            return []
+        body: List[Dict] = []
+        for index, query in searches:
+            body.extend(({'index': index}, with_profile(query)))
+        docs = await self.elastic.msearch(body=body)
+        for response in docs['responses']:
+            if 'error' not in response:
+                continue
+            if response['status'] == HTTPStatus.NOT_FOUND:
+                raise HTTPException(status_code=HTTPStatus.NOT_FOUND)
+            raise TransportError(response['status'], response['error']['type'], response['error'])
+        tracing.set_attributes({
+            'elasticsearch.searches': len(searches),
+            'elasticsearch.docs': sum(len(found['hits']['hits']) for found in docs['responses']),
+        })
+        return [[doc['_source'] for doc in found['hits']['hits']] for found in docs['responses']]
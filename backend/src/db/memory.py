@@ -0,0 +1,77 @@
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from core.metrics import count_cache_request
+
+
+class MemoryCache:
+    """Класс LRU-кэша в памяти процесса, ограниченного количеством записей, их объёмом и временем жизни."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float) -> None:
+        """
+        При инициализации класса задаются ограничения кэша.
+
+        Args:
+            max_entries: Максимальное количество записей
+            max_bytes: Максимальный суммарный объём записей в байтах
+            ttl: Время жизни записи в секундах
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.entries: OrderedDict[str, Tuple[float, int, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Получение записи, которая при этом становится самой свежей по использованию.
+
+        Args:
+            key: Ключ от данных
+
+        Returns:
+            Optional[Any]: Данные либо None, если записи нет или её время жизни истекло
+        """
+        entry = self.entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            count_cache_request('memory', 'miss')
+            self.delete(key)
+            return None
+        count_cache_request('memory', 'hit')
+        self.entries.move_to_end(key)
+        return entry[2]
+
+    def set(self, key: str, value: Any, size: int, ttl: Optional[float] = None):
+        """
+        Запись данных с вытеснением давно не использованных записей при превышении ограничений.
+
+        Args:
+            key: Ключ от данных
+            value: Данные для записи
+            size: Объём данных в байтах
+            ttl: Время жизни записи, если оно меньше времени жизни кэша
+        """
+        if size > self.max_bytes:
+            return
+        self.delete(key)
+        expires_at = time.monotonic() + min(self.ttl, ttl or self.ttl)
+        self.entries[key] = (expires_at, size, value)
+        self.size += size
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            _, (_, evicted_size, _) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+
+    def delete(self, key: str):
+        """
+        Удаление записи.
+
+        Args:
+            key: Ключ от данных
+        """
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+
+cache: Optional[MemoryCache] = None
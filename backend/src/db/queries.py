@@ -1,8 +1,10 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 
 from elasticsearch_dsl import Search
 from elasticsearch_dsl.query import MatchPhrase, Nested, QueryString, Term, Terms
 
+PERSON_FILMS_LIMIT = 1000
+
 
 def genres_by_film(film: Dict) -> Dict:
     """
@@ -47,7 +49,26 @@ def films_by_person(person: Dict, fields: Optional[List] = None) -> Dict:
         Nested(path='actors', query=Term(actors__id=person['id'])) |
         Nested(path='writers', query=Term(writers__id=person['id'])) |
         MatchPhrase(director=person['full_name']),
-    )[:1000]
+    )[:PERSON_FILMS_LIMIT]
+    return query.to_dict()
+
+
+def films_by_ids(film_ids: List[str], fields: Optional[List] = None) -> Dict:
+    """
+    Функция для получения запроса в Elasticsearch с целью получить фильмы по их ID.
+
+    Фильмов не больше `PERSON_FILMS_LIMIT`, как и в запросе `films_by_person`, чтобы не превысить
+    `index.max_result_window` и ограничение на количество терминов в запросе.
+
+    Args:
+        film_ids: ID фильмов
+        fields: Поля индекса в Elasticsearch с данными фильма
+
+    Returns:
+        Dict: Запрос в Elasticsearch для фильмов
+    """
+    query = Search().source(fields).sort('-imdb_rating').filter(Terms(id=film_ids[:PERSON_FILMS_LIMIT]))
+    query = query[:PERSON_FILMS_LIMIT]
     return query.to_dict()
 
 
@@ -78,3 +99,31 @@ def search_data(query_str: str, fields: Optional[List] = None) -> Dict:
     """
     query = Search().filter(QueryString(query=query_str, fields=fields))
     return query.to_dict()
+
+
+def search_after(queryset: Dict, after: Optional[List], pit: Optional[Dict]) -> Dict:
+    """
+    Функция для получения запроса в Elasticsearch с целью получить страницу после документа с заданной сортировкой.
+
+    К сортировке запроса добавляется сортировка по ID, чтобы порядок документов был однозначным,
+    если запрос не сортируется по ID сам.
+
+    Args:
+        queryset: Запрос в Elasticsearch с телом, сортировкой и размером страницы
+        after: Значения сортировки последнего документа предыдущей страницы
+        pit: Point-in-time, в котором выполняется запрос
+
+    Returns:
+        Dict: Запрос в Elasticsearch для страницы
+    """
+    field, _, order = queryset.get('sort', '_score:desc').partition(':')
+    sort: List[Union[Dict, str]] = [{field: {'order': order}}]
+    if field != 'id':
+        sort.append('id')
+    query = Search.from_dict(queryset.get('body') or {}).sort(*sort)
+    query = query.extra(size=queryset['size'])
+    if after:
+        query = query.extra(search_after=after)
+    if pit:
+        query = query.extra(pit=pit)
+    return query.to_dict()
@@ -1,31 +1,199 @@
-from typing import Optional
+from contextlib import asynccontextmanager, contextmanager
+from secrets import token_hex
+from typing import AsyncIterator, Iterator, List, Optional
 
-from aioredis import Redis
-from aioredis.errors import ConnectionClosedError
+from opentelemetry import trace
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import ConnectionError, TimeoutError
 
 from db.base import DatabaseModel
+from core import tracing
+from core.breaker import redis_breaker
 from core.decorators import backoff
+from core.metrics import REDIS_LATENCY, REDIS_POOL_IN_USE, REDIS_POOL_WAIT
 
 connection: Optional[Redis] = None
 
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
 
-async def get_redis() -> Redis:
+
+class MeteredConnectionPool(BlockingConnectionPool):
+    """Класс пула соединений с Redis, который учитывает ожидание свободного соединения и занятые соединения."""
+
+    async def get_connection(self, command_name, *keys, **options):
+        """
+        Получение соединения из пула с ожиданием, если все соединения заняты.
+
+        Args:
+            command_name: Название команды Redis
+            keys: Ключи команды
+            options: Параметры команды
+
+        Returns:
+            Connection: Соединение с Redis
+        """
+        with REDIS_POOL_WAIT.time():
+            redis_connection = await super().get_connection(command_name, *keys, **options)
+        REDIS_POOL_IN_USE.set(self.max_connections - self.pool.qsize())
+        return redis_connection
+
+    async def release(self, redis_connection):
+        """
+        Возвращение соединения в пул.
+
+        Args:
+            redis_connection: Соединение с Redis
+        """
+        await super().release(redis_connection)
+        REDIS_POOL_IN_USE.set(self.max_connections - self.pool.qsize())
+
+
+@contextmanager
+def measure_command(command: str) -> Iterator[trace.Span]:
+    """
+    Функция для измерения времени выполнения команды Redis в метриках и в спане трассировки.
+
+    Args:
+        command: Название команды
+
+    Yields:
+        Span: Спан выполнения команды
+    """
+    with REDIS_LATENCY.labels(command=command).time():
+        with tracing.start_client_span(
+            'redis {0}'.format(command), {'db.system': 'redis', 'db.operation': command},
+        ) as span:
+            yield span
+
+
+class MeteredPipeline(Pipeline):
+    """Класс конвейера команд Redis, который измеряет время его выполнения."""
+
+    async def execute(self, raise_on_error: bool = True) -> list:
+        """
+        Выполнение команд конвейера за один обмен с Redis.
+
+        Время учитывается под названием из команд конвейера без повторов, например `GET+ZINCRBY`.
+
+        Args:
+            raise_on_error: Пробрасывать ли ошибку первой неуспешной команды
+
+        Returns:
+            list: Ответы на команды в порядке их добавления
+        """
+        command = '+'.join(dict.fromkeys(str(args[0]).upper() for args, _ in self.command_stack))
+        with measure_command(command):
+            return await super().execute(raise_on_error)
+
+
+class MeteredRedis(Redis):
+    """Класс клиента Redis, который измеряет время выполнения команд и конвейеров команд."""
+
+    async def execute_command(self, *args, **options):
+        """
+        Выполнение команды Redis.
+
+        Args:
+            args: Название и аргументы команды
+            options: Параметры команды
+
+        Returns:
+            Any: Ответ на команду
+        """
+        command = str(args[0]).upper()
+        with measure_command(command):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> Pipeline:
+        """
+        Создание конвейера команд, которые отправляются в Redis за один обмен.
+
+        Args:
+            transaction: Выполнять ли команды в транзакции
+            shard_hint: Подсказка для выбора шарда
+
+        Returns:
+            Pipeline: Конвейер команд
+        """
+        return MeteredPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+async def get_redis() -> Optional[Redis]:
     """
     Функция для объявления соединения с Redis, которая понадобится при внедрении зависимостей.
 
     Returns:
-        Redis: Соединение с Redis
+        Optional[Redis]: Соединение с Redis либо None до подключения
     """
     return connection
 
 
-class RedisStorage(DatabaseModel):
+class RedisLockStorage(DatabaseModel):
+    """Класс для работы с блокировками в Redis, которые разделяют вычисление данных между процессами."""
+
+    redis: Redis
+
+    @backoff(errors=(ConnectionError, TimeoutError), breaker=redis_breaker)
+    async def acquire_redis_lock(self, key: str, token: str, expire: float) -> bool:
+        """
+        Захватить блокировку в Redis, если её ещё никто не захватил.
+
+        Args:
+            key: Ключ блокировки
+            token: Уникальное значение владельца блокировки
+            expire: Время жизни блокировки в секундах
+
+        Returns:
+            bool: Захвачена ли блокировка
+        """
+        acquired = await self.redis.set(key, token, px=int(expire * 1000), nx=True)
+        return bool(acquired)
+
+    @backoff(errors=(ConnectionError, TimeoutError), breaker=redis_breaker)
+    async def release_redis_lock(self, key: str, token: str):
+        """
+        Освободить блокировку в Redis, только если она всё ещё принадлежит владельцу.
+
+        Args:
+            key: Ключ блокировки
+            token: Уникальное значение владельца блокировки
+        """
+        await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, key, token)
+
+    @asynccontextmanager
+    async def redis_lock(self, key: str, expire: float) -> AsyncIterator[bool]:
+        """
+        Контекстный менеджер блокировки в Redis, которая освобождается при выходе из контекста.
+
+        Args:
+            key: Ключ блокировки
+            expire: Время жизни блокировки в секундах
+
+        Yields:
+            bool: Захвачена ли блокировка
+        """
+        token = token_hex(nbytes=16)
+        acquired = await self.acquire_redis_lock(key, token, expire)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await self.release_redis_lock(key, token)
+
+
+class RedisStorage(RedisLockStorage):
     """Класс для работы с хранилищем Redis в виде кэша данных."""
 
     redis: Redis
 
-    @backoff(errors=(ConnectionClosedError))
-    async def get_redis_value(self, key: str) -> bytes:
+    @backoff(errors=(ConnectionError, TimeoutError), breaker=redis_breaker)
+    async def get_redis_value(self, key: str) -> Optional[bytes]:
         """
         Получить данных из кэша Redis.
 
@@ -33,19 +201,85 @@ class RedisStorage(DatabaseModel):
             key: Ключ от данных
 
         Returns:
-            bytes: Данные из кэша
+            Optional[bytes]: Данные из кэша либо None, если их нет
         """
-        value = await self.redis.get(key=key)
+        value = await self.redis.get(key)
         return value
 
-    @backoff(errors=(ConnectionClosedError))
-    async def set_redis_value(self, key: str, data: str, **kwargs):
+    @backoff(errors=(ConnectionError, TimeoutError), breaker=redis_breaker)
+    async def set_redis_value(self, key: str, data: bytes, expire: Optional[int] = None):
         """
         Записать данные в кэш Redis.
 
         Args:
             key: Ключ от данных
             data: Данные для записи
-            kwargs: Необязательные именованные аргументы
+            expire: Время жизни данных в секундах
+        """
+        await self.redis.set(key, data, ex=expire)
+
+    @backoff(errors=(ConnectionError, TimeoutError), breaker=redis_breaker)
+    async def incr_redis_values(self, keys: List[str]) -> List[int]:
+        """
+        Увеличить несколько счётчиков в Redis на единицу за один обмен с Redis.
+
+        Args:
+            keys: Ключи счётчиков
+
+        Returns:
+            List[int]: Новые значения счётчиков в порядке ключей
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.incr(key)
+            return await pipe.execute()
+
+    @backoff(errors=(ConnectionError, TimeoutError), breaker=redis_breaker)
+    async def get_redis_value_and_incr_score(
+        self, key: str, score_key: str, member: bytes, capacity: int,
+    ) -> Optional[bytes]:
+        """
+        Получить данные из кэша Redis и увеличить на единицу вес элемента сортированного множества за один обмен.
+
+        Множество сразу обрезается до `capacity` элементов с наибольшим весом, чтобы оно не росло без ограничений.
+
+        Args:
+            key: Ключ от данных
+            score_key: Ключ сортированного множества
+            member: Элемент множества
+            capacity: Максимальное количество элементов множества
+
+        Returns:
+            Optional[bytes]: Данные из кэша
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(key).zincrby(score_key, 1, member).zremrangebyrank(score_key, 0, -capacity - 1)
+            value, _, _ = await pipe.execute()
+        return value
+
+    @backoff(errors=(ConnectionError, TimeoutError), breaker=redis_breaker)
+    async def get_redis_top(self, key: str, count: int) -> List[bytes]:
+        """
+        Получить элементы сортированного множества Redis с наибольшим весом.
+
+        Args:
+            key: Ключ сортированного множества
+            count: Количество элементов
+
+        Returns:
+            List[bytes]: Элементы множества по убыванию веса
+        """
+        return await self.redis.zrevrange(key, 0, count - 1)
+
+    @backoff(errors=(ConnectionError, TimeoutError), breaker=redis_breaker)
+    async def get_redis_values(self, keys: List[str]) -> List[Optional[bytes]]:
+        """
+        Получить несколько значений из кэша Redis одной командой.
+
+        Args:
+            keys: Ключи от данных
+
+        Returns:
+            List[Optional[bytes]]: Данные из кэша в порядке ключей
         """
-        await self.redis.set(key, data, **kwargs)
+        return await self.redis.mget(*keys)
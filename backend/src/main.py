@@ -1,27 +1,12 @@
-import logging
-from http import HTTPStatus
-from typing import Callable
-
-import jwt
 import uvicorn
-from fastapi import Depends, FastAPI, Header, Request, Response
+from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
 
-from api.views import router
+from api import metrics, views
+from services import catalog, warmup
+from core import logger, middleware, telemetry
 from core.config import CONFIG
-from core.logger import LOGGING, RequestIdFilter
-from db import connections
-
-
-async def logging_request_id(request_id: str = Header(default=None, alias='X-Request-Id')):
-    """Функция для добавления в лог информацию о `request-id`, с которым был выполнен запрос.
-
-    Args:
-        request_id: X-Request-Id, переданный через заголовок запроса
-    """
-    logger = logging.getLogger('uvicorn.access')
-    logger.addFilter(RequestIdFilter(request_id))
-
+from db import connections, elastic, redis
 
 app = FastAPI(
     title=CONFIG.fastapi.project_name,
@@ -30,59 +15,46 @@ app = FastAPI(
     docs_url=f'/{CONFIG.fastapi.docs}',
     openapi_url=f'/{CONFIG.fastapi.docs}.json',
     default_response_class=ORJSONResponse,
-    dependencies=[Depends(logging_request_id)],
 )
 
 
 @app.on_event('startup')
 async def startup():
     """Подключаемся к базам данных при старте сервера."""
+    telemetry.start_tracing()
     await connections.start_redis()
+    connections.start_memory_cache()
     await connections.start_elasticsearch()
     await connections.create_genres_index()
     await connections.create_persons_index()
     await connections.create_movies_index()
 
 
-@app.middleware('http')
-async def access_control(request: Request, call_next: Callable) -> Response:
-    """Управление доступом к ресурсам.
-
-    Args:
-        request: Запрос клиента
-        call_next: Функция-обработчик запроса
-
-    Returns:
-        Response: Ответ сервера
-    """
-    url_path, headers = request.scope['path'], request.headers
-    if url_path in {app.docs_url, f'{app.docs_url}/', app.openapi_url}:
-        return await call_next(request)
-    if CONFIG.fastapi.debug is False and url_path != request.app.url_path_for('films'):
-        try:
-            jwt.decode(
-                jwt=headers['authorization'].split()[1],
-                key=CONFIG.fastapi.secret_key,
-                algorithms=['HS256'],
-            )
-        except KeyError:
-            return Response('Доступ только авторизованным пользователям!', status_code=HTTPStatus.UNAUTHORIZED)
-        except jwt.ExpiredSignatureError:
-            return Response('Сессия устарела!', status_code=HTTPStatus.UNAUTHORIZED)
-        except Exception as exc:
-            logging.error('Проблема с авторизацией пользователей: {exc}!'.format(exc=exc))
-            return Response('Ведутся технические работы!', status_code=HTTPStatus.BAD_REQUEST)
-    return await call_next(request)
+@app.on_event('startup')
+async def load_catalog():
+    """Загружаем справочник жанров в память и прогреваем кэш после подключения к базам данных."""
+    await catalog.genres.start(elastic.connection, interval=CONFIG.fastapi.genres_refresh_in_seconds)
+    warmup.warmer.start(elastic.connection, redis.connection)
 
 
 @app.on_event('shutdown')
 async def shutdown():
     """Отключаемся от баз данных при выключении сервера."""
+    await warmup.warmer.stop()
+    await catalog.genres.stop()
     await connections.stop_redis()
     await connections.stop_elasticsearch()
+    metrics.mark_process_dead()
+    telemetry.stop_tracing()
 
 
-app.include_router(router, prefix='/api/v1')
+app.add_middleware(middleware.AccessControlMiddleware)
+app.add_middleware(middleware.MetricsMiddleware)
+app.add_middleware(middleware.ProfileMiddleware)
+app.add_middleware(middleware.TracingMiddleware)
+app.add_middleware(middleware.RequestContextMiddleware)
+app.include_router(views.router, prefix='/api/v1')
+app.include_router(metrics.router)
 
 
 if __name__ == '__main__':
@@ -90,6 +62,6 @@ if __name__ == '__main__':
         'main:app',
         host=CONFIG.fastapi.host,
         port=CONFIG.fastapi.port,
-        log_config=LOGGING,
-        log_level=logging.DEBUG,
+        log_config=logger.LOGGING,
+        log_level=CONFIG.logging.level.lower(),
     )
@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import logging
+from typing import Callable, Dict, List
+
+from services.base import ElasticIndices
+from services.cache import GENERATION_KEY
+from services.indexer import index_persons
+from services.warmup import warmer
+from core import logger  # noqa: F401
+from core.config import CONFIG
+from db import connections, elastic, redis
+
+
+async def invalidate(indices: List[str]):
+    """
+    Инвалидация кэша данных индексов увеличением их поколения.
+
+    Args:
+        indices: Названия индексов
+    """
+    storage = redis.RedisStorage(redis=redis.connection)
+    indices = [ElasticIndices(index).value for index in indices]
+    generations = await storage.incr_redis_values([GENERATION_KEY.format(index=index) for index in indices])
+    for index, generation in zip(indices, generations):
+        logging.info('Поколение данных индекса {0}: {1}.'.format(index, generation))
+
+
+async def denormalize(args: argparse.Namespace):
+    """
+    Команда для денормализации роли и фильмов в документы персон после загрузки данных.
+
+    Args:
+        args: Аргументы командной строки
+    """
+    await index_persons(elastic.connection)
+    await invalidate([ElasticIndices.persons.value])
+
+
+async def invalidate_cache(args: argparse.Namespace):
+    """
+    Команда для инвалидации кэша после загрузки данных в индексы, по умолчанию во все.
+
+    Args:
+        args: Аргументы командной строки
+    """
+    await invalidate(args.indices or [index.value for index in ElasticIndices])
+    await warm_up(args)
+
+
+async def warm_up(args: argparse.Namespace):
+    """
+    Команда для прогрева кэша востребованными представлениями.
+
+    Args:
+        args: Аргументы командной строки
+
+    Raises:
+        RuntimeError: Если нет соединения с Redis
+    """
+    if redis.connection is None:
+        raise RuntimeError('Нет соединения с Redis!')
+    await warmer.run(elastic.connection, redis.connection)
+
+
+COMMANDS: Dict[str, Callable] = {
+    'index_persons': denormalize,
+    'invalidate': invalidate_cache,
+    'warmup': warm_up,
+}
+
+
+async def run(args: argparse.Namespace):
+    """
+    Корутина для выполнения команды с подключением к базам данных.
+
+    Args:
+        args: Аргументы командной строки
+    """
+    await connections.start_redis()
+    await connections.start_elasticsearch()
+    await COMMANDS[args.command](args)
+    await connections.stop_elasticsearch()
+    await connections.stop_redis()
+
+
+def main():
+    """Функция с основной логикой работы программы."""
+    parser = argparse.ArgumentParser(description='Служебные команды {0}'.format(CONFIG.fastapi.project_name))
+    parser.add_argument('command', choices=COMMANDS)
+    parser.add_argument('indices', nargs='*', help='Индексы для инвалидации кэша, по умолчанию все')
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
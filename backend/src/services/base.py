@@ -1,11 +1,13 @@
 import abc
+import random
 from enum import Enum
-from functools import wraps
-from typing import Callable, Type, Union
+from typing import ClassVar, Dict, Optional, Tuple, Type, Union
 
-from pydantic import BaseModel, parse_obj_as, parse_raw_as
+import orjson
+from pydantic import PrivateAttr
 
-from core.config import CinemaObject, CinemaObjectList
+from core.config import CONFIG, CinemaObject, CinemaObjectList
+from core.context import request_context
 from db.elastic import ElasticStorage
 from db.redis import RedisStorage
 
@@ -18,47 +20,78 @@ class ElasticIndices(Enum):
     genres = 'genres'
 
 
+HOT_SPECS_KEY = 'warmup:hot'
+
+DEPENDENT_INDICES: Dict[str, Tuple[str, ...]] = {
+    'movies': ('movies', 'genres', 'persons'),
+    'persons': ('persons', 'movies'),
+    'genres': ('genres',),
+}
+
+
 class BaseService(ElasticStorage, RedisStorage, abc.ABC):
     """Абстрактный класс сервиса для реализации бизнес-логики по работе с кинотеатром."""
 
     index: ElasticIndices
     model: Type[Union[CinemaObject, CinemaObjectList]]
+    key_version: ClassVar[int] = 1
+    _next_cursor: Optional[str] = PrivateAttr(default=None)
+
+    @property
+    def cacheable(self) -> bool:
+        """
+        Можно ли хранить представление данных сервиса в кэше.
+
+        Returns:
+            bool: True, если представление кэшируется
+        """
+        return True
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        """
+        Курсор следующей страницы, если представление получено постранично по курсору и она есть.
+
+        Returns:
+            Optional[str]: Курсор следующей страницы либо None
+        """
+        return self._next_cursor
 
     @property
     @abc.abstractmethod
     def redis_key(self) -> str:
-        """Ключ от данных в кэше Redis в виде строки."""
+        """Ключ от данных в кэше Redis в виде строки c версией схемы ключей и представлений."""
 
+    @property
     @abc.abstractmethod
-    async def get(self) -> Union[CinemaObject, CinemaObjectList]:
-        """Получить представление данных кинотеатра."""
+    def spec(self) -> Dict:
+        """Описание запроса, по которому сервис можно создать заново."""
+
+    async def get_recorded_value(self, key: str) -> Optional[bytes]:
+        """
+        Получение данных из кэша Redis с учётом обращения к ним, чтобы прогревать кэш самыми востребованными запросами.
+
+        Учитывается только доля `warmup.hot_sample_rate` обращений клиентов: обращения при прогреве кэша
+        не учитываются, чтобы он не закреплял сам себя, а слишком длинные описания запросов не сохраняются.
+
+        Args:
+            key: Ключ от данных
+
+        Returns:
+            Optional[bytes]: Данные из кэша
+        """
+        if request_context.get() is None or random.random() >= CONFIG.warmup.hot_sample_rate:  # noqa: S311
+            return await self.get_redis_value(key)
+        member = orjson.dumps(self.spec, option=orjson.OPT_SORT_KEYS)
+        if len(member) > CONFIG.warmup.hot_member_max_bytes:
+            return await self.get_redis_value(key)
+        return await self.get_redis_value_and_incr_score(key, HOT_SPECS_KEY, member, CONFIG.warmup.hot_capacity)
+
+    @abc.abstractmethod
+    async def get(self) -> bytes:
+        """Получить представление данных кинотеатра в виде JSON."""
 
     class Config:
         """Настройки валидиции."""
 
         use_enum_values = True
-
-
-def redis_cache(expire: int) -> Callable:
-    """
-    Декоратор для получения и сохранения данных кинотеатра в кеше Redis.
-
-    Args:
-        expire: Время жизни кеша
-
-    Returns:
-        Callable: Декорируемая функция, получающая представление данных кинотетра
-    """
-    def decorator(get) -> Callable:
-        @wraps(get)
-        async def wrapper(*args, **kwargs) -> BaseModel:
-            self: BaseService = args[0]
-            data = await self.get_redis_value(self.redis_key)
-            if not data:
-                data = parse_obj_as(
-                    self.model, obj=await get(*args, **kwargs),
-                ).json()
-                await self.set_redis_value(self.redis_key, data, expire=expire)
-            return parse_raw_as(self.model, b=data)
-        return wrapper
-    return decorator
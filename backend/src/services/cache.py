@@ -0,0 +1,175 @@
+import asyncio
+from functools import partial, wraps
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from fastapi import HTTPException
+from pydantic import parse_obj_as
+
+from services import catalog, loader
+from services.base import DEPENDENT_INDICES, BaseService, ElasticIndices
+from core import breaker, context, tracing
+from core.config import CONFIG
+from core.singleflight import SingleFlight
+from db import cache, memory
+
+GENERATION_KEY = 'generation:{index}'
+
+flights = SingleFlight()
+generations: Dict[str, Tuple[float, str]] = {}
+
+
+async def get_generation(service: BaseService) -> str:
+    """
+    Получение поколения данных индекса сервиса и индексов, из которых добираются его данные.
+
+    Поколение индекса увеличивается после загрузки в него данных, поэтому ключи с прежним поколением
+    перестают использоваться. Прочитанное из Redis поколение кешируется в памяти процесса ненадолго,
+    а пока Redis недоступен, используется последнее прочитанное.
+
+    Args:
+        service: Сервис, выполняющий бизнес-логику с данными кинотеатра
+
+    Returns:
+        str: Поколения индексов, разделённые точками
+    """
+    loop, index = asyncio.get_running_loop(), ElasticIndices(service.index).value
+    cached = generations.get(index)
+    if cached and cached[0] > loop.time():
+        return cached[1]
+    try:
+        counters = await service.get_redis_values(
+            [GENERATION_KEY.format(index=dependency) for dependency in DEPENDENT_INDICES[index]],
+        )
+    except breaker.BackendUnavailable:
+        return cached[1] if cached else ''
+    generation = '.'.join(str(int(counter or 0)) for counter in counters)
+    generations[index] = (loop.time() + CONFIG.cache.generation_ttl_in_seconds, generation)
+    return generation
+
+
+async def get_cache_key(service: BaseService) -> str:
+    """
+    Получение ключа от данных сервиса в кеше с текущим поколением данных индексов.
+
+    Args:
+        service: Сервис, выполняющий бизнес-логику с данными кинотеатра
+
+    Returns:
+        str: Ключ от данных в кеше
+    """
+    return '{0}::g{1}'.format(service.redis_key, await get_generation(service))
+
+
+async def sync_catalog(service: BaseService):
+    """
+    Перезагрузка справочника жанров перед вычислением данных, если они зависят от жанров, а их поколение изменилось.
+
+    Поколение читается после ключа от данных, поэтому справочник не старше поколения, под которым данные сохранятся.
+    Одновременные перезагрузки в процессе объединяются.
+
+    Args:
+        service: Сервис, выполняющий бизнес-логику с данными кинотеатра
+    """
+    dependencies = DEPENDENT_INDICES[ElasticIndices(service.index).value]
+    generation = await get_generation(service)
+    if not generation or ElasticIndices.genres.value not in dependencies:
+        return
+    counter = generation.split('.')[dependencies.index(ElasticIndices.genres.value)]
+    if counter != catalog.genres.generation:
+        await flights.run(
+            f'catalog::genres::g{counter}',
+            partial(catalog.genres.load, service.elastic, counter),
+            timeout=CONFIG.cache.flight_timeout_in_seconds,
+        )
+
+
+def serialize(service: BaseService, obj: Any) -> bytes:
+    """
+    Сериализация представления данных кинотеатра в JSON по модели сервиса.
+
+    Args:
+        service: Сервис, выполняющий бизнес-логику с данными кинотеатра
+        obj: Представление данных кинотеатра
+
+    Returns:
+        bytes: Данные в формате JSON
+    """
+    with tracing.tracer.start_as_current_span('serialize') as span:
+        data = parse_obj_as(service.model, obj=obj).json().encode()
+        span.set_attribute('serialize.bytes', len(data))
+    return data
+
+
+@tracing.traced('cache')
+async def get_cached_data(
+    service: BaseService, key: str, expire: int, get: Callable[[], Awaitable],
+) -> cache.CacheEntry:
+    """
+    Получение записи из кеша в памяти процесса, а при её отсутствии из кеша Redis.
+
+    В спан трассировки записываются ключ и то, откуда получены данные: `memory`, `redis`, `miss`
+    либо `redis_unavailable`. Запрос, дождавшийся чужой загрузки, получает только ключ.
+
+    Args:
+        service: Сервис, выполняющий бизнес-логику с данными кинотеатра
+        key: Ключ от данных в кеше
+        expire: Время, в течение которого данные считаются свежими
+        get: Корутина-функция, получающая представление данных кинотеатра
+
+    Raises:
+        HTTPException: Ошибка 504, если данные не получены за отведённое время
+
+    Returns:
+        cache.CacheEntry: Запись кеша
+    """
+    tracing.set_attributes({'cache.key': key})
+    cached = memory.cache.get(key) if memory.cache else None
+    if cached is not None:
+        tracing.set_attributes({'cache.result': 'memory'})
+        return cached
+    try:
+        return await flights.run(
+            key,
+            partial(loader.load_data, service, key, expire, get),
+            timeout=CONFIG.cache.flight_timeout_in_seconds,
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=HTTPStatus.GATEWAY_TIMEOUT)
+
+
+def redis_cache(expire: int) -> Callable:
+    """
+    Декоратор для получения и сохранения данных кинотеатра в кеше Redis.
+
+    Декорируемая функция возвращает данные, уже сериализованные в JSON функцией `serialize`,
+    а из кеша они возвращаются готовыми байтами, чтобы их можно было отдать в ответе без создания моделей.
+
+    Перед Redis данные ищутся в кеше в памяти процесса, куда попадают после каждого обращения к Redis.
+    Одновременные промахи по одному ключу объединяются: в процессе выполняется одна загрузка,
+    а между процессами данные вычисляет только захвативший блокировку в Redis.
+    Устаревшие или досрочно выбранные для обновления данные отдаются сразу, а обновляются в фоне.
+    В ключ входит поколение данных индексов, поэтому после загрузки данных кеш сразу перестаёт их отдавать.
+    Запросы с профилированием Elasticsearch выполняются в обход кеша, чтобы профиль был получен.
+
+    Args:
+        expire: Время, в течение которого данные считаются свежими
+
+    Returns:
+        Callable: Декорируемая функция, получающая представление данных кинотеатра в формате JSON
+    """
+    def decorator(get) -> Callable:
+        @wraps(get)
+        async def wrapper(*args, **kwargs) -> bytes:
+            self: BaseService = args[0]
+            if not self.cacheable or context.is_profiling():
+                return await get(*args, **kwargs)
+            key = await get_cache_key(self)
+            await sync_catalog(self)
+            get_data = partial(get, *args, **kwargs)
+            entry = await get_cached_data(self, key, expire, get_data)
+            if entry.expiring(CONFIG.cache.xfetch_beta):
+                flights.start(f'{key}::refresh', partial(loader.refresh_data, self, key, expire, get_data))
+            return entry.data
+        return wrapper
+    return decorator
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+
+from elasticsearch import AsyncElasticsearch, ElasticsearchException
+from fastapi import HTTPException
+
+from db.elastic import ElasticStorage
+
+MAX_GENRES = 10000
+
+
+class GenreCatalog:
+    """
+    Класс справочника жанров, который хранится в памяти процесса и периодически обновляется.
+
+    Кроме периодического обновления справочник перезагружается, когда увеличивается поколение данных жанров,
+    чтобы в кеш под новым поколением не попали данные из прежнего справочника.
+    """
+
+    def __init__(self) -> None:
+        """При инициализации класса справочник пуст до первой успешной загрузки из Elasticsearch."""
+        self.genres: List[Dict] = []
+        self.by_id: Dict[str, Dict] = {}
+        self.by_name: Dict[str, Dict] = {}
+        self.loaded = False
+        self.generation: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def get(self, genre_id: Optional[UUID]) -> Optional[Dict]:
+        """
+        Получение жанра по ID.
+
+        Args:
+            genre_id: ID жанра
+
+        Returns:
+            Optional[Dict]: Данные жанра либо None, если его нет в справочнике
+        """
+        return self.by_id.get(str(genre_id))
+
+    def find(self, names: Iterable[str]) -> List[Dict]:
+        """
+        Получение жанров по их названиям.
+
+        Args:
+            names: Названия жанров
+
+        Returns:
+            List[Dict]: Данные найденных жанров
+        """
+        return [self.by_name[name] for name in names if name in self.by_name]
+
+    async def load(self, elastic: AsyncElasticsearch, generation: Optional[str] = None):
+        """
+        Загрузка всех жанров из Elasticsearch с заменой текущего содержимого справочника.
+
+        При ошибке справочник остаётся прежним, а сервис продолжает работу.
+
+        Args:
+            elastic: Соединение с Elasticsearch
+            generation: Поколение данных жанров, при котором загружается справочник, если оно известно
+        """
+        storage = ElasticStorage(elastic=elastic)
+        try:
+            genres = await storage.search_elastic_docs('genres', {'size': MAX_GENRES})
+        except (ElasticsearchException, HTTPException) as exc:
+            logging.error('Не удалось загрузить справочник жанров: {0}!'.format(exc))
+            return
+        self.genres = genres
+        self.by_id = {genre['id']: genre for genre in genres}
+        self.by_name = {genre['name']: genre for genre in genres}
+        self.loaded = bool(genres)
+        self.generation = generation
+
+    async def refresh(self, elastic: AsyncElasticsearch, interval: int):
+        """
+        Корутина для периодического обновления справочника, которая работает, пока справочник не остановлен.
+
+        Args:
+            elastic: Соединение с Elasticsearch
+            interval: Интервал обновления в секундах
+        """
+        while self.task:
+            await asyncio.sleep(interval)
+            await self.load(elastic, self.generation)
+
+    async def start(self, elastic: AsyncElasticsearch, interval: int):
+        """
+        Первичная загрузка справочника и запуск фоновой задачи его обновления.
+
+        Args:
+            elastic: Соединение с Elasticsearch
+            interval: Интервал обновления в секундах
+        """
+        await self.load(elastic)
+        self.task = asyncio.create_task(self.refresh(elastic, interval))
+
+    async def stop(self):
+        """Остановка фоновой задачи обновления справочника."""
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+
+genres = GenreCatalog()
@@ -0,0 +1,178 @@
+import base64
+import time
+from http import HTTPStatus
+from operator import itemgetter
+from string import digits
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+from elasticsearch import RequestError
+from fastapi import HTTPException
+
+from services.mixins import QuerysetMixin
+from core.config import CONFIG
+from db import queries
+
+
+def encode_cursor(after: List, pit: Optional[str]) -> str:
+    """
+    Функция для получения непрозрачного курсора следующей страницы.
+
+    Args:
+        after: Значения сортировки последнего документа страницы
+        pit: ID point-in-time, в котором выполняется обход
+
+    Returns:
+        str: Курсор в base64
+    """
+    return base64.urlsafe_b64encode(orjson.dumps({'after': after, 'pit': pit})).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[List, Optional[str]]:
+    """
+    Функция для разбора непустого курсора страницы.
+
+    Args:
+        cursor: Курсор в base64
+
+    Raises:
+        HTTPException: Если курсор повреждён или его значения не того типа, то отдаём HTTP-статус 400
+
+    Returns:
+        Tuple[List, Optional[str]]: Значения сортировки последнего документа и ID point-in-time
+    """
+    try:
+        after, pit = itemgetter('after', 'pit')(orjson.loads(base64.urlsafe_b64decode(cursor)))
+    except (ValueError, KeyError, TypeError):
+        after, pit = None, None
+    scalars = isinstance(after, list) and all(isinstance(item, (str, int, float, type(None))) for item in after)
+    if not after or not scalars or not isinstance(pit, (str, type(None))):
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail='Некорректный курсор страницы')
+    return after, pit
+
+
+class OpenPits:
+    """Класс учёта point-in-time, открытых обходами по курсору, чтобы они не исчерпали контексты поиска."""
+
+    units = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+    def __init__(self, max_open: int, keep_alive: str):
+        """
+        При инициализации класса время жизни point-in-time переводится в секунды.
+
+        Args:
+            max_open: Сколько point-in-time процесс может держать открытыми одновременно
+            keep_alive: Время жизни point-in-time между запросами, например `1m`
+        """
+        unit = keep_alive.lstrip(digits)
+        self.ttl = int(keep_alive[:-len(unit)]) * self.units[unit]
+        self.max_open = max_open
+        self.expires: Dict[str, float] = {}
+
+    def available(self) -> bool:
+        """
+        Можно ли открыть ещё один point-in-time: истёкшие при этом забываются.
+
+        Returns:
+            bool: Меньше ли открыто point-in-time, чем разрешено
+        """
+        now = time.monotonic()
+        self.expires = {pit_id: expires for pit_id, expires in self.expires.items() if expires > now}
+        return len(self.expires) < self.max_open
+
+    def touch(self, pit_id: str):
+        """
+        Учёт point-in-time, время жизни которого продлено очередной страницей.
+
+        Args:
+            pit_id: ID point-in-time
+        """
+        self.expires[pit_id] = time.monotonic() + self.ttl
+
+    def discard(self, pit_id: str):
+        """
+        Удаление point-in-time из учёта, когда он закрыт.
+
+        Args:
+            pit_id: ID point-in-time
+        """
+        self.expires.pop(pit_id, None)
+
+
+pits = OpenPits(CONFIG.elastic.pit_max_open, CONFIG.elastic.pit_keep_alive)
+
+
+class CursorMixin(QuerysetMixin):
+    """Миксин для постраничного обхода запроса по курсору в point-in-time Elasticsearch."""
+
+    _next_cursor: Optional[str]
+
+    async def get_docs_after(self, queryset: Dict) -> List[Dict]:
+        """
+        Получение страницы документов после позиции из курсора, которое не дорожает с глубиной страницы.
+
+        Первая страница читается без point-in-time, чтобы запросы, которые дальше не идут, его не открывали.
+        Point-in-time открывается со второй страницы, если он включён и процесс не держит их слишком много,
+        и закрывается, как только страница оказывается неполной.
+
+        Args:
+            queryset: Запрос в Elasticsearch
+
+        Raises:
+            HTTPException: Если Elasticsearch не принял значения из курсора, то отдаём HTTP-статус 400
+
+        Returns:
+            List[Dict]: Список данных документов
+        """
+        after, pit_id = decode_cursor(self.cursor) if self.cursor else (None, None)
+        body = queries.search_after(queryset, after, pit=None)
+        if after and len(after) != len(body['sort']):
+            raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail='Некорректный курсор страницы')
+        pit_id = await self.get_pit(after, pit_id)
+        if pit_id:
+            body.update(pit={'id': pit_id, 'keep_alive': CONFIG.elastic.pit_keep_alive})
+        try:
+            hits, pit_id = await self.search_elastic_hits(  # type: ignore[attr-defined]
+                None if pit_id else self.index, body,  # type: ignore[attr-defined]
+            )
+        except RequestError:
+            await self.set_next_cursor([], queryset['size'], pit_id)
+            raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail='Некорректный курсор страницы')
+        await self.set_next_cursor(hits, queryset['size'], pit_id)
+        return [hit['_source'] for hit in hits]
+
+    async def get_pit(self, after: Optional[List], pit_id: Optional[str]) -> Optional[str]:
+        """
+        Получение point-in-time для страницы: из курсора либо нового, если это вторая страница обхода.
+
+        Args:
+            after: Значения сортировки последнего документа предыдущей страницы
+            pit_id: ID point-in-time из курсора
+
+        Returns:
+            Optional[str]: ID point-in-time либо None, если страница читается без него
+        """
+        if pit_id or not after or not CONFIG.elastic.pit_enabled or not pits.available():
+            return pit_id
+        opened = await self.open_elastic_pit(  # type: ignore[attr-defined]
+            self.index, keep_alive=CONFIG.elastic.pit_keep_alive,  # type: ignore[attr-defined]
+        )
+        pits.touch(opened)
+        return opened
+
+    async def set_next_cursor(self, hits: List[Dict], size: int, pit_id: Optional[str]):
+        """
+        Сохранение курсора следующей страницы, если текущая заполнена, иначе закрытие point-in-time обхода.
+
+        Args:
+            hits: Найденные документы страницы
+            size: Размер страницы
+            pit_id: ID point-in-time, в котором выполнен запрос
+        """
+        if hits and len(hits) == size:
+            self._next_cursor = encode_cursor(hits[-1]['sort'], pit_id)
+            if pit_id:
+                pits.touch(pit_id)
+        elif pit_id:
+            pits.discard(pit_id)
+            await self.close_elastic_pit(pit_id)  # type: ignore[attr-defined]
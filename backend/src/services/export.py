@@ -0,0 +1,77 @@
+from typing import AsyncIterator, Dict, List, Optional
+from uuid import UUID
+
+from services.base import ElasticIndices
+from services.list import ListService
+from core.config import CONFIG
+from db import queries
+
+
+class ExportService(ListService):
+    """Сервис для выгрузки всех объектов индекса потоком NDJSON пачками по порядку ID."""
+
+    after: Optional[UUID]
+
+    def get_queryset(self) -> Dict:
+        """
+        Создание запроса всех документов индекса, отсортированных по ID, чтобы выгрузку можно было продолжить.
+
+        Returns:
+            Dict: Запрос в Elasticsearch
+        """
+        return {'sort': 'id:asc', 'size': CONFIG.elastic.export_batch_size}
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        """
+        Выгрузка объектов: каждая пачка запрашивается, только когда предыдущая отправлена клиенту.
+
+        Обход выполняется в point-in-time, если он включён в настройках, и начинается после объекта
+        из параметра `after`, то есть после последнего объекта, полученного при прерванной выгрузке.
+
+        Yields:
+            bytes: Строки NDJSON с объектами одной пачки
+        """
+        queryset = self.get_queryset()
+        after = [str(self.after)] if self.after else None
+        async with self.elastic_pit(
+            ElasticIndices(self.index).value, CONFIG.elastic.pit_keep_alive, enabled=CONFIG.elastic.pit_enabled,
+        ) as pit:
+            while True:
+                hits = await self.get_batch(queryset, after, pit)
+                if hits:
+                    yield await self.dump_batch(hits)
+                if len(hits) < queryset['size']:
+                    break
+                after = hits[-1]['sort']
+
+    async def get_batch(self, queryset: Dict, after: Optional[List], pit: Optional[Dict]) -> List[Dict]:
+        """
+        Получение пачки документов после документа с заданными значениями сортировки.
+
+        Args:
+            queryset: Запрос в Elasticsearch
+            after: Значения сортировки последнего документа предыдущей пачки
+            pit: Point-in-time, в котором выполняется обход, в него сохраняется ID для следующей пачки
+
+        Returns:
+            List[Dict]: Найденные документы
+        """
+        hits, pit_id = await self.search_elastic_hits(
+            None if pit else self.index, queries.search_after(queryset, after, pit),
+        )
+        if pit and pit_id:
+            pit.update(id=pit_id)
+        return hits
+
+    async def dump_batch(self, hits: List[Dict]) -> bytes:
+        """
+        Сериализация пачки объектов кинотеатра в строки NDJSON.
+
+        Args:
+            hits: Найденные документы
+
+        Returns:
+            bytes: Строки NDJSON
+        """
+        obj_list = await self.get_objects([hit['_source'] for hit in hits], self.model.item)
+        return b'\n'.join([*(obj.json().encode() for obj in obj_list), b''])
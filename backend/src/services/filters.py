@@ -4,9 +4,12 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field
 
+from services import catalog
 from services.base import BaseService
 from db import queries
 
+QUERY_OPERATORS = frozenset(('AND', 'OR', 'NOT'))
+
 
 class BaseFilter(BaseModel, abc.ABC):
     """Абстрактный класс фильтра данных кинотеатра."""
@@ -62,7 +65,7 @@ class FilterGenreFilms(FilterFilms):
         Returns:
             Dict: Запрос с фильтрацией по жанру
         """
-        genre = await service.get_elastic_doc(index='genres', doc_id=self.id)
+        genre = catalog.genres.get(self.id) or await service.get_elastic_doc(index='genres', doc_id=self.id)
         return queries.films_by_genre(genre)
 
 
@@ -82,6 +85,9 @@ class FilterPersonFilms(FilterFilms):
             Dict: Запрос с фильтрацией по персоне
         """
         person = await service.get_elastic_doc(index='persons', doc_id=self.id)
+        film_ids = person.get('film_ids')
+        if film_ids is not None:
+            return queries.films_by_ids(film_ids, fields=['id', 'title', 'imdb_rating'])
         return queries.films_by_person(person, fields=['id', 'title', 'imdb_rating'])
 
 
@@ -91,6 +97,21 @@ class QuerySearch(BaseFilter):
     q_string: Optional[str]
     fields: List[str] = Field(default_factory=list)
 
+    @property
+    def canonical(self) -> str:
+        """
+        Строка запроса для ключа кэша: в нижнем регистре с единичными пробелами, кроме логических операторов.
+
+        В Elasticsearch строка запроса передаётся как есть, потому что регистр важен для полей keyword,
+        регулярных выражений и шаблонов.
+
+        Returns:
+            str: Нормализованная строка запроса
+        """
+        return ' '.join(
+            word if word in QUERY_OPERATORS else word.lower() for word in (self.q_string or '').split()
+        )
+
     def __str__(self) -> str:
         """
         Строковое представление в виде переданной строки запроса.
@@ -0,0 +1,176 @@
+import logging
+import re
+from collections import Counter, defaultdict
+from typing import DefaultDict, Dict, Iterator, List, Set, Tuple
+
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_bulk, async_scan
+
+from db.connections import PERSON_FILMS_PROPERTIES
+from db.queries import PERSON_FILMS_LIMIT
+from models.person import RoleChoices
+
+Words = Tuple[str, ...]
+Phrase = Tuple[Words, str]
+
+FILM_FIELDS = ('id', 'imdb_rating', 'actors', 'writers', *RoleChoices.__members__)
+
+
+async def collect_persons(elastic: AsyncElasticsearch) -> Dict[str, str]:
+    """
+    Получение имён всех персон из Elasticsearch.
+
+    Args:
+        elastic: Соединение с Elasticsearch
+
+    Returns:
+        Dict[str, str]: Полные имена персон по их ID
+    """
+    return {
+        doc['_source']['id']: doc['_source']['full_name']
+        async for doc in async_scan(elastic, index='persons', _source=['id', 'full_name'])
+    }
+
+
+class PersonPhrases:
+    """
+    Класс поиска персон, имя которых входит в имя режиссёра фразой, как в запросе `MatchPhrase` по полю `director`.
+
+    Слова сравниваются в нижнем регистре, но без стемминга анализатора `ru_en`,
+    поэтому разные словоформы одного имени не совпадают.
+    """
+
+    def __init__(self, persons: Dict[str, str]) -> None:
+        """
+        При инициализации класса имена персон группируются по первому слову.
+
+        Args:
+            persons: Полные имена персон по их ID
+        """
+        self.phrases: DefaultDict[str, List[Phrase]] = defaultdict(list)
+        for person_id, full_name in persons.items():
+            words = self.get_words(full_name)
+            if words:
+                self.phrases[words[0]].append((words, person_id))
+
+    def get_words(self, text: str) -> Words:
+        """
+        Разбиение текста на слова в нижнем регистре.
+
+        Args:
+            text: Текст
+
+        Returns:
+            Words: Слова текста
+        """
+        return tuple(re.findall(r'\w+', text.lower()))
+
+    def find(self, name: str) -> Iterator[str]:
+        """
+        Поиск персон по имени режиссёра.
+
+        Args:
+            name: Имя режиссёра из данных фильма
+
+        Yields:
+            str: ID персоны
+        """
+        words = self.get_words(name)
+        for position, word in enumerate(words):
+            for phrase, person_id in self.phrases.get(word, []):
+                if words[position:position + len(phrase)] == phrase:
+                    yield person_id
+
+
+def get_film_persons(film: Dict, phrases: PersonPhrases) -> Set[str]:
+    """
+    Получение ID персон фильма: актёров и сценаристов по ID, а режиссёров по фразе из имени.
+
+    Args:
+        film: Данные фильма
+        phrases: Поиск персон по имени режиссёра
+
+    Returns:
+        Set[str]: ID персон фильма
+    """
+    person_ids = {person['id'] for person in film.get('actors', []) + film.get('writers', [])}
+    for name in film.get('director', []):
+        person_ids.update(phrases.find(name))
+    return person_ids
+
+
+async def collect_films(elastic: AsyncElasticsearch, persons: Dict[str, str]) -> DefaultDict[str, List[Dict]]:
+    """
+    Получение фильмов каждой персоны так же, как это делает запрос `queries.films_by_person`.
+
+    Args:
+        elastic: Соединение с Elasticsearch
+        persons: Полные имена персон по их ID
+
+    Returns:
+        DefaultDict[str, List[Dict]]: Фильмы по ID персоны
+    """
+    phrases = PersonPhrases(persons)
+    films: DefaultDict[str, List[Dict]] = defaultdict(list)
+    async for doc in async_scan(elastic, index='movies', _source=list(FILM_FIELDS)):
+        for film_person_id in get_film_persons(doc['_source'], phrases) & persons.keys():
+            films[film_person_id].append(doc['_source'])
+    return films
+
+
+def get_person_doc(full_name: str, films: List[Dict]) -> Dict:
+    """
+    Получение денормализованных данных персоны: основной роли, ID и количества её фильмов.
+
+    Args:
+        full_name: Полное имя персоны
+        films: Фильмы с участием персоны
+
+    Returns:
+        Dict: Роль, ID не более `PERSON_FILMS_LIMIT` фильмов по убыванию рейтинга и их количество
+    """
+    films = sorted(films, key=lambda film: film.get('imdb_rating') or 0, reverse=True)
+    roles = Counter(
+        role.value for film in films for role in RoleChoices if full_name in film.get(role.name, [])
+    )
+    return {
+        'role': roles.most_common(1)[0][0] if roles else '',
+        'film_ids': [film['id'] for film in films[:PERSON_FILMS_LIMIT]],
+        'films_count': len(films),
+    }
+
+
+def get_actions(persons: Dict[str, str], films: Dict[str, List[Dict]]) -> Iterator[Dict]:
+    """
+    Генерация действий для частичного обновления документов персон bulk-запросом.
+
+    Args:
+        persons: Полные имена персон по их ID
+        films: Фильмы по ID персоны
+
+    Yields:
+        Dict: Действие обновления документа персоны
+    """
+    yield from (
+        {
+            '_op_type': 'update',
+            '_index': 'persons',
+            '_id': person_id,
+            'doc': get_person_doc(full_name, films.get(person_id, [])),
+        }
+        for person_id, full_name in persons.items()
+    )
+
+
+async def index_persons(elastic: AsyncElasticsearch):
+    """
+    Корутина для денормализации роли и фильмов в документы персон после загрузки данных.
+
+    Args:
+        elastic: Соединение с Elasticsearch
+    """
+    await elastic.indices.put_mapping(index='persons', body={'properties': PERSON_FILMS_PROPERTIES})
+    persons = await collect_persons(elastic)
+    films = await collect_films(elastic, persons)
+    updated, _ = await async_bulk(elastic, get_actions(persons, films), refresh=True)
+    logging.info('Обновлено персон: {0}.'.format(updated))
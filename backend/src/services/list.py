@@ -1,41 +1,122 @@
-from typing import List, Type
+import hashlib
+from typing import Dict, List, Type
 
-from services.base import BaseService, redis_cache
-from services.mixins import QuerysetMixin, SingleObjectMixin
-from core.config import CONFIG, CinemaObject, CinemaObjectList
+import orjson
 
+from services import catalog
+from services.base import BaseService
+from services.cache import redis_cache, serialize
+from services.cursor import CursorMixin
+from services.mixins import SingleObjectMixin
+from core.config import CONFIG, CinemaObjectList
 
-class ListService(BaseService, SingleObjectMixin, QuerysetMixin):
+
+class ListService(BaseService, SingleObjectMixin, CursorMixin):
     """Сервис для представления списка объектов кинотеатра."""
 
     model: Type[CinemaObjectList]
 
+    @property
+    def params(self) -> Dict:
+        """
+        Нормализованные параметры запроса без пустых значений.
+
+        Сортировка приводится к единому виду ещё при создании сервиса, а поисковый запрос только здесь.
+
+        Returns:
+            Dict: Параметры запроса
+        """
+        params = {
+            'filter': self.filter and [type(self.filter).__name__, str(self.filter)],
+            'page_number': self.page_number,
+            'page_size': self.page_size,
+            'query': self.query and self.query.canonical,
+            'sort': self.sort,
+        }
+        return {field: value for field, value in params.items() if value is not None}
+
     @property
     def redis_key(self) -> str:
         """
-        Ключ от данных в кэше Redis в виде индекса и параметров запроса в URL-адресе.
+        Ключ от данных в кэше Redis в виде индекса, версии и хеша нормализованных параметров запроса.
+
+        Одинаковые по смыслу запросы дают один ключ.
+
+        Returns:
+            str: Индекс, версия и хеш параметров разделённые двоеточиями
+        """
+        canonical = orjson.dumps(self.params, option=orjson.OPT_SORT_KEYS)
+        return '{index}::v{version}::list::{digest}'.format(
+            index=self.index, version=self.key_version, digest=hashlib.blake2b(canonical, digest_size=16).hexdigest(),
+        )
+
+    @property
+    def spec(self) -> Dict:
+        """
+        Описание запроса, по которому сервис можно создать заново для прогрева кэша.
 
         Returns:
-            str: Индекс и параметры разделённые двоеточиями
+            Dict: Класс сервиса, индекс, модель и параметры запроса
         """
-        params = [
-            f'{field}::{value}' for field, value in self.__repr_args__()
-            if field in {'filter', 'page_number', 'page_size', 'query', 'sort'}
-        ]
-        return '{index}::{params}'.format(index=self.index, params='::'.join(params))
+        spec = {'service': type(self).__name__, 'index': self.index, 'model': self.model.__name__, **self.params}
+        if self.query:
+            spec.update(query=str(self.query), fields=self.query.fields)
+        return spec
 
-    @redis_cache(expire=CONFIG.fastapi.cache_expire_in_seconds)
-    async def get(self) -> List[CinemaObject]:
+    @redis_cache(expire=CONFIG.cache.expire_in_seconds)
+    async def get(self) -> bytes:
         """
         Основной метод получения списка объектов кинотеатра.
 
         Returns:
-            CinemaObjectList: Список объектов кинотеатра
+            bytes: Список объектов кинотеатра в формате JSON
         """
         queryset = await self.filter_queryset(self.get_queryset())
         page = self.paginate_queryset(queryset)
-        data = await self.search_elastic_docs(self.index, page)
-        obj_list = [
-            await self.get_object(item, self.model.item) for item in data
-        ]
-        return obj_list
+        data = await self.get_docs(page)
+        obj_list = await self.get_objects(data, self.model.item)
+        return serialize(self, obj_list)
+
+    async def get_docs(self, queryset: Dict) -> List[Dict]:
+        """
+        Получение данных документов, соответствующих запросу.
+
+        Args:
+            queryset: Запрос в Elasticsearch
+
+        Returns:
+            List[Dict]: Список данных документов
+        """
+        if self.cursor is not None:
+            return await self.get_docs_after(queryset)
+        return await self.search_elastic_docs(self.index, queryset)
+
+    @property
+    def cacheable(self) -> bool:
+        """
+        Страницы по курсору не кэшируются: они глубокие, редкие и привязаны к point-in-time.
+
+        Returns:
+            bool: True, если страница запрошена без курсора
+        """
+        return self.cursor is None
+
+
+class GenreListService(ListService):
+    """Сервис для представления списка жанров из справочника в памяти."""
+
+    async def get_docs(self, queryset: Dict) -> List[Dict]:
+        """
+        Получение страницы жанров из справочника без обращения к Elasticsearch.
+
+        Args:
+            queryset: Запрос в Elasticsearch с параметрами страницы
+
+        Returns:
+            List[Dict]: Список данных жанров
+        """
+        if not catalog.genres.loaded:
+            return await super().get_docs(queryset)
+        start = queryset.get('from_', 0)
+        end = start + queryset['size'] if 'size' in queryset else None
+        return [genre.copy() for genre in catalog.genres.genres[start:end]]
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from services.base import BaseService
+from core import breaker, metrics, tracing
+from core.config import CONFIG
+from db import cache, memory
+
+
+async def wait_cached_data(service: BaseService, key: str, lock_key: str) -> Optional[cache.CacheEntry]:
+    """
+    Ожидание данных, которые вычисляет другой процесс, захвативший блокировку.
+
+    Args:
+        service: Сервис, выполняющий бизнес-логику с данными кинотеатра
+        key: Ключ от данных в кеше
+        lock_key: Ключ блокировки вычисления данных
+
+    Returns:
+        Optional[cache.CacheEntry]: Запись кеша либо None, если данные не сохранены или время ожидания истекло
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + CONFIG.cache.wait_timeout_in_seconds
+    while loop.time() < deadline:
+        await asyncio.sleep(CONFIG.cache.lock_poll_in_seconds)
+        raw, lock = await service.get_redis_values([key, lock_key])
+        if raw or not lock:
+            return cache.CacheEntry.unpack(raw)
+    return None
+
+
+@tracing.traced('cache.compute')
+async def create_entry(service: BaseService, expire: int, get: Callable[[], Awaitable]) -> cache.CacheEntry:
+    """
+    Вычисление данных кинотеатра и создание записи кеша с ними.
+
+    Args:
+        service: Сервис, выполняющий бизнес-логику с данными кинотеатра
+        expire: Время, в течение которого данные считаются свежими
+        get: Корутина-функция, получающая представление данных кинотеатра
+
+    Returns:
+        cache.CacheEntry: Запись кеша
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    data = await get()
+    return cache.CacheEntry.create(data, expire=expire, delta=loop.time() - start)
+
+
+async def store_data(service: BaseService, key: str, expire: int, get: Callable[[], Awaitable]) -> cache.CacheEntry:
+    """
+    Вычисление данных кинотеатра и сохранение их в кеш Redis.
+
+    Запись считается свежей `expire` секунд, а хранится ещё `stale_in_seconds`, чтобы её можно было отдать,
+    пока в фоне вычисляются новые данные. Если Redis недоступен, вычисленные данные всё равно возвращаются.
+
+    Args:
+        service: Сервис, выполняющий бизнес-логику с данными кинотеатра
+        key: Ключ от данных в кеше
+        expire: Время, в течение которого данные считаются свежими
+        get: Корутина-функция, получающая представление данных кинотеатра
+
+    Returns:
+        cache.CacheEntry: Запись кеша
+    """
+    entry = await create_entry(service, expire, get)
+    raw = entry.pack(CONFIG.cache.codec, min_size=CONFIG.cache.compress_min_bytes)
+    try:
+        await service.set_redis_value(key, raw, expire=expire + CONFIG.cache.stale_in_seconds)
+    except breaker.BackendUnavailable as exc:
+        logging.warning('Данные не сохранены в кеш {key}: {exc}!'.format(key=key, exc=exc.detail))
+    return entry
+
+
+async def compute_data(service: BaseService, key: str, expire: int, get: Callable[[], Awaitable]) -> cache.CacheEntry:
+    """
+    Вычисление данных кинотеатра и сохранение их в кеш только одним процессом среди всех воркеров.
+
+    Процесс, захвативший блокировку в Redis, вычисляет данные, а остальные ждут их появления в кеше.
+
+    Args:
+        service: Сервис, выполняющий бизнес-логику с данными кинотеатра
+        key: Ключ от данных в кеше
+        expire: Время, в течение которого данные считаются свежими
+        get: Корутина-функция, получающая представление данных кинотеатра
+
+    Returns:
+        cache.CacheEntry: Запись кеша
+    """
+    lock_key = f'{key}::lock'
+    async with service.redis_lock(lock_key, expire=CONFIG.cache.lock_expire_in_seconds) as acquired:
+        entry = None if acquired else await wait_cached_data(service, key, lock_key)
+        if entry is None:
+            entry = await store_data(service, key, expire, get)
+    return entry
+
+
+def remember(key: str, entry: cache.CacheEntry) -> cache.CacheEntry:
+    """
+    Сохранение записи в кеш в памяти процесса.
+
+    Args:
+        key: Ключ от данных в кеше
+        entry: Запись кеша
+
+    Returns:
+        cache.CacheEntry: Запись кеша
+    """
+    if memory.cache:
+        memory.cache.set(key, entry, size=len(entry.data))
+    return entry
+
+
+async def load_data(service: BaseService, key: str, expire: int, get: Callable[[], Awaitable]) -> cache.CacheEntry:
+    """
+    Получение записи из кеша Redis, а при её отсутствии вычисление и сохранение в кеш.
+
+    Заодно учитывается обращение к данным: загрузка из Redis выполняется не чаще, чем истекает кеш в памяти,
+    поэтому счётчик отражает востребованность запроса, не нагружая Redis на каждом попадании.
+    Пока Redis недоступен, данные вычисляются без него и сохраняются только в кеш в памяти процесса.
+
+    Args:
+        service: Сервис, выполняющий бизнес-логику с данными кинотеатра
+        key: Ключ от данных в кеше
+        expire: Время, в течение которого данные считаются свежими
+        get: Корутина-функция, получающая представление данных кинотеатра
+
+    Returns:
+        cache.CacheEntry: Запись кеша
+    """
+    try:
+        raw = await service.get_recorded_value(key)
+    except breaker.BackendUnavailable:
+        tracing.set_attributes({'cache.result': 'redis_unavailable'})
+        return remember(key, await create_entry(service, expire, get))
+    entry = cache.CacheEntry.unpack(raw)
+    tracing.set_attributes({'cache.result': 'miss' if entry is None else 'redis'})
+    metrics.count_cache_request('redis', 'miss' if entry is None else 'hit')
+    if entry is None:
+        entry = await compute_data(service, key, expire, get)
+    return remember(key, entry)
+
+
+async def refresh_data(service: BaseService, key: str, expire: int, get: Callable[[], Awaitable]):
+    """
+    Фоновое обновление устаревающих данных в кеше, если их уже не обновляет другой процесс.
+
+    Args:
+        service: Сервис, выполняющий бизнес-логику с данными кинотеатра
+        key: Ключ от данных в кеше
+        expire: Время, в течение которого данные считаются свежими
+        get: Корутина-функция, получающая представление данных кинотеатра
+    """
+    try:
+        async with service.redis_lock(f'{key}::lock', expire=CONFIG.cache.lock_expire_in_seconds) as acquired:
+            if acquired:
+                remember(key, await store_data(service, key, expire, get))
+    except Exception as exc:
+        logging.error('Не удалось обновить данные в кеше {key}: {exc}!'.format(key=key, exc=exc))
@@ -1,8 +1,10 @@
-from typing import Dict, List, Optional, Type
+from typing import Dict, List, Optional, Tuple, Type
 
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
 
+from services import catalog
 from services.filters import FilterFilms, QuerySearch
+from core import tracing
 from core.config import CinemaObject
 from db import queries
 from models.film import Film
@@ -23,49 +25,79 @@ class SingleObjectMixin(BaseModel):
         Returns:
             CinemaObject: Объект кинотеатра
         """
-        if model == Film:
-            data.update(await self.add_to_film(data))
-        elif model == Person:
-            data.update(await self.add_to_person(data))
-        return model(uuid=data['id'], **data)
+        obj_list = await self.get_objects([data], model)
+        return obj_list[0]
 
-    async def add_to_film(self, film: Dict) -> Dict:
+    @tracing.traced('enrich')
+    async def get_objects(self, data: List[Dict], model: Type[CinemaObject]) -> List[CinemaObject]:
         """
-        Добавление к данным фильма информации о его жанрах и режиссёрах из соответствующих индексов.
+        Получение списка объектов с добором данных из других индексов Elasticsearch одним запросом.
 
         Args:
-            film: Данные фильма
+            data: Список данных для обработки
+            model: Модель по которой нужно получить объекты
 
         Returns:
-            Dict: Жанры и режиссёры фильма
+            List[CinemaObject]: Список объектов кинотеатра
+        """
+        searches = [self.get_related_queries(item, model) for item in data]
+        tracing.set_attributes({'enrich.model': model.__name__, 'enrich.objects': len(data)})
+        related = iter(await self.msearch_elastic_docs(  # type: ignore[attr-defined]
+            [search for item_searches in searches for search in item_searches],
+        ))
+        for obj_data, obj_searches in zip(data, searches):
+            obj_data.update(self.get_related_data(obj_data, model, [next(related) for _ in obj_searches]))
+        return [model(uuid=item['id'], **item) for item in data]
+
+    def get_related_queries(self, data: Dict, model: Type[CinemaObject]) -> List[Tuple[str, Dict]]:
         """
-        genres = await self.search_elastic_docs(  # type: ignore[attr-defined]
-            index='genres', queryset={'body': queries.genres_by_film(film)},
-        )
-        directors = await self.search_elastic_docs(  # type: ignore[attr-defined]
-            index='persons', queryset={'body': queries.directors_by_film(film)},
-        )
-        return {'genre': genres, 'directors': directors}
+        Запросы в другие индексы Elasticsearch, необходимые для добора данных объекта.
 
-    async def add_to_person(self, person: Dict) -> Dict:
+        Args:
+            data: Данные объекта
+            model: Модель объекта
+
+        Returns:
+            List[Tuple[str, Dict]]: Пары из индекса и тела запроса
         """
-        Добавление к данным персоны информации о его роли и фильмах из соответствующего индекса.
+        if model == Film:
+            searches = [('persons', queries.directors_by_film(data))]
+            if not catalog.genres.loaded:
+                searches.append(('genres', queries.genres_by_film(data)))
+            return searches
+        if model == Person and any(key not in data for key in ('role', 'film_ids')):
+            return [
+                ('movies', queries.films_by_person(
+                    data, fields=['id', 'actors_names', 'writers_names', 'director'],
+                )),
+            ]
+        return []
+
+    def get_related_data(self, data: Dict, model: Type[CinemaObject], related: List[List[Dict]]) -> Dict:
+        """
+        Формирование дополнительных данных объекта из результатов запросов в другие индексы.
 
         Args:
-            person: Данные персоны
+            data: Данные объекта
+            model: Модель объекта
+            related: Результаты запросов в порядке `get_related_queries`
 
         Returns:
-            Dict: Роль и ID фильмов с участием персоны
-        """
-        films = await self.search_elastic_docs(  # type: ignore[attr-defined]
-            index='movies', queryset={'body': queries.films_by_person(
-                person, fields=['id', 'actors_names', 'writers_names', 'director'],
-            )},
-        )
-        return {
-            'film_ids': [film['id'] for film in films],
-            'role': self.parse_role(person['full_name'], films),
-        }
+            Dict: Дополнительные данные объекта
+        """
+        if model == Film:
+            directors, *genres = related
+            return {
+                'genre': genres[0] if genres else catalog.genres.find(data['genre']),
+                'directors': directors,
+            }
+        if model == Person and related:
+            films = related[0]
+            return {
+                'film_ids': [film['id'] for film in films],
+                'role': self.parse_role(data['full_name'], films),
+            }
+        return {}
 
     def parse_role(self, person_name: str, films: List[Dict]) -> str:
         """
@@ -94,6 +126,26 @@ class QuerysetMixin(BaseModel):
     page_size: Optional[int]
     query: Optional[QuerySearch]
     sort: Optional[str]
+    cursor: Optional[str]
+
+    @validator('sort')
+    @classmethod
+    def normalize_sort(cls, sort: Optional[str]) -> Optional[str]:
+        """
+        Приведение параметра сортировки к виду `поле:порядок`, в котором его принимает Elasticsearch.
+
+        Args:
+            sort: Параметр сортировки в виде `-поле`, `поле` или `поле:порядок`
+
+        Returns:
+            Optional[str]: Поле и порядок сортировки через двоеточие
+        """
+        field, _, order = (sort or '').strip().partition(':')
+        if not field:
+            return None
+        if field.startswith('-'):
+            return '{0}:desc'.format(field[1:])
+        return '{0}:{1}'.format(field, order.lower() or 'asc')
 
     def get_queryset(self) -> Dict:
         """
@@ -104,9 +156,7 @@ class QuerysetMixin(BaseModel):
         """
         queryset: Dict = {}
         if self.sort:
-            queryset.update(
-                sort=f'{self.sort[1:]}:desc' if self.sort.startswith('-') else self.sort,
-            )
+            queryset.update(sort=self.sort)
         return queryset
 
     async def filter_queryset(self, queryset: Dict) -> Dict:
@@ -140,8 +190,7 @@ class QuerysetMixin(BaseModel):
             Dict: Запрос с получением страницы
         """
         if (page := self.page_number) and (size := self.page_size):
-            queryset.update(
-                from_=(page - 1) * size if page > 1 else 0,
-                size=size,
-            )
+            queryset.update(size=size)
+            if self.cursor is None:
+                queryset.update(from_=(page - 1) * size if page > 1 else 0)
         return queryset
@@ -1,9 +1,12 @@
-from typing import Optional, Type
+from typing import Dict, Optional, Type
 from uuid import UUID
 
-from services.base import BaseService, redis_cache
+from services import catalog
+from services.base import BaseService
+from services.cache import redis_cache, serialize
 from services.mixins import SingleObjectMixin
 from core.config import CONFIG, CinemaObject
+from core.decorators import timed
 
 
 class RetrieveService(BaseService, SingleObjectMixin):
@@ -15,21 +18,55 @@ class RetrieveService(BaseService, SingleObjectMixin):
     @property
     def redis_key(self) -> str:
         """
-        Ключ от данных в кэше Redis в виде индекса и ID запрашиваемого документа.
+        Ключ от данных в кэше Redis в виде индекса, версии и ID запрашиваемого документа.
 
         Returns:
-            str: Индекс и ID разделённые двоеточиями
+            str: Индекс, версия и ID разделённые двоеточиями
         """
-        return '{index}::id::{id}'.format(index=self.index, id=self.id)
+        return '{index}::v{version}::id::{id}'.format(index=self.index, version=self.key_version, id=self.id)
 
-    @redis_cache(expire=CONFIG.fastapi.cache_expire_in_seconds)
-    async def get(self) -> CinemaObject:
+    @property
+    def spec(self) -> Dict:
+        """
+        Описание запроса, по которому сервис можно создать заново для прогрева кэша.
+
+        Returns:
+            Dict: Класс сервиса, индекс, модель и ID документа
+        """
+        return {'service': type(self).__name__, 'index': self.index, 'model': self.model.__name__, 'id': str(self.id)}
+
+    @redis_cache(expire=CONFIG.cache.expire_in_seconds)
+    @timed('Получение объекта {0.index}::id::{0.id} из Elasticsearch')
+    async def get(self) -> bytes:
         """
         Основной метод получения одного объекта кинотеатра.
 
         Returns:
-            CinemaObject: Объект кинотеатра
+            bytes: Объект кинотеатра в формате JSON
         """
-        data = await self.get_elastic_doc(self.index, self.id)
+        data = await self.get_doc()
         obj = await self.get_object(data, self.model)
-        return obj
+        return serialize(self, obj)
+
+    async def get_doc(self) -> Dict:
+        """
+        Получение данных запрашиваемого документа.
+
+        Returns:
+            Dict: Данные документа
+        """
+        return await self.get_elastic_doc(self.index, self.id)
+
+
+class GenreRetrieveService(RetrieveService):
+    """Сервис для представления жанра по ID из справочника в памяти."""
+
+    async def get_doc(self) -> Dict:
+        """
+        Получение данных жанра из справочника, а при его отсутствии там из Elasticsearch.
+
+        Returns:
+            Dict: Данные жанра
+        """
+        genre = catalog.genres.get(self.id)
+        return genre.copy() if genre else await super().get_doc()
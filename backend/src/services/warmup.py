@@ -0,0 +1,205 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional, get_args
+
+import orjson
+from elasticsearch import AsyncElasticsearch
+from redis.asyncio import Redis
+
+from services import catalog, filters, retrieve
+from services.base import HOT_SPECS_KEY, BaseService
+from services.list import GenreListService, ListService
+from core.config import CONFIG, CinemaObject, CinemaObjectList
+from db.redis import RedisStorage
+
+SERVICES = {
+    service.__name__: service
+    for service in (ListService, GenreListService, retrieve.RetrieveService, retrieve.GenreRetrieveService)
+}
+FILTERS = {
+    filter_class.__name__: filter_class for filter_class in (filters.FilterGenreFilms, filters.FilterPersonFilms)
+}
+MODELS = {model.__name__: model for model in (*get_args(CinemaObject), *get_args(CinemaObjectList))}
+SPEC_FIELDS = frozenset(('service', 'model', 'filter', 'query', 'fields'))
+
+
+def build_filter(name: str, obj_id: str) -> filters.FilterFilms:
+    """
+    Создание фильтра фильмов по названию его класса.
+
+    Args:
+        name: Название класса фильтра
+        obj_id: ID объекта, по которому выполняется фильтрация
+
+    Returns:
+        filters.FilterFilms: Фильтр фильмов
+    """
+    filter_class = FILTERS[name]
+    return filter_class.parse_obj({filter_class.__fields__['id'].alias: obj_id})
+
+
+def build_service(spec: Dict, elastic: AsyncElasticsearch, redis: Redis) -> BaseService:
+    """
+    Создание сервиса по описанию запроса, которое возвращает свойство `spec` сервиса.
+
+    Args:
+        spec: Описание запроса
+        elastic: Соединение с Elasticsearch
+        redis: Соединение с Redis
+
+    Returns:
+        BaseService: Сервис для получения представления данных кинотеатра
+    """
+    service, model = SERVICES[spec['service']], MODELS[spec['model']]
+    params = {field: value for field, value in spec.items() if field not in SPEC_FIELDS}
+    if spec.get('filter'):
+        params.update(filter=build_filter(*spec['filter']))
+    if spec.get('query'):
+        params.update(query=filters.QuerySearch(q_string=spec['query'], fields=spec.get('fields', [])))
+    return service(elastic=elastic, redis=redis, model=model, **params)
+
+
+def get_film_list_specs() -> List[Dict]:
+    """
+    Описания первых страниц главной страницы, в том числе с фильтрацией по каждому жанру справочника.
+
+    Returns:
+        List[Dict]: Описания запросов, начиная со страниц без фильтрации
+    """
+    genre_filters = [None, *(['FilterGenreFilms', genre['id']] for genre in catalog.genres.genres)]
+    pages = [(sort, page) for sort in CONFIG.warmup.sorts for page in range(1, CONFIG.warmup.pages + 1)]
+    return [
+        {
+            'service': ListService.__name__,
+            'index': 'movies',
+            'model': 'FilmList',
+            'filter': genre_filter,
+            'page_number': page,
+            'page_size': CONFIG.warmup.page_size,
+            'sort': sort,
+        }
+        for genre_filter in genre_filters
+        for sort, page in pages
+    ]
+
+
+def get_film_specs(pages: Iterable[Optional[bytes]]) -> List[Dict]:
+    """
+    Описания страниц самых популярных фильмов, которые попали на первые страницы главной страницы.
+
+    Args:
+        pages: Представления первых страниц главной страницы
+
+    Returns:
+        List[Dict]: Описания запросов
+    """
+    film_ids = [film['uuid'] for page in pages if page for film in orjson.loads(page)]
+    return [
+        {'service': retrieve.RetrieveService.__name__, 'index': 'movies', 'model': 'Film', 'id': film_id}
+        for film_id in dict.fromkeys(film_ids).keys()
+    ][:CONFIG.warmup.films]
+
+
+async def get_hot_specs(redis: Redis) -> List[Dict]:
+    """
+    Описания самых востребованных запросов, которые учитываются при загрузке данных из Redis.
+
+    Args:
+        redis: Соединение с Redis
+
+    Returns:
+        List[Dict]: Описания запросов
+    """
+    if not CONFIG.warmup.hot_specs:
+        return []
+    members = await RedisStorage(redis=redis).get_redis_top(HOT_SPECS_KEY, CONFIG.warmup.hot_specs)
+    return [orjson.loads(member) for member in members]
+
+
+class CacheWarmer:
+    """Класс прогрева кэша самыми востребованными представлениями с ограниченным числом одновременных запросов."""
+
+    def __init__(self) -> None:
+        """При инициализации класса прогрев не запущен."""
+        self.task: Optional[asyncio.Task] = None
+        self.semaphore = asyncio.Semaphore(CONFIG.warmup.concurrency)
+
+    async def warm(self, spec: Dict, elastic: AsyncElasticsearch, redis: Redis) -> Optional[bytes]:
+        """
+        Получение представления через кэш, чтобы при промахе оно вычислилось и сохранилось.
+
+        Args:
+            spec: Описание запроса
+            elastic: Соединение с Elasticsearch
+            redis: Соединение с Redis
+
+        Returns:
+            Optional[bytes]: Представление либо None, если его не удалось получить
+        """
+        async with self.semaphore:
+            try:
+                return await build_service(spec, elastic, redis).get()
+            except Exception as exc:
+                logging.warning('Не удалось прогреть кэш {0}: {1!r}'.format(spec, exc))
+                return None
+
+    async def warm_all(self, specs: List[Dict], elastic: AsyncElasticsearch, redis: Redis) -> List[Optional[bytes]]:
+        """
+        Прогрев кэша по описаниям запросов без повторов.
+
+        Args:
+            specs: Описания запросов
+            elastic: Соединение с Elasticsearch
+            redis: Соединение с Redis
+
+        Returns:
+            List[Optional[bytes]]: Представления в порядке описаний запросов
+        """
+        unique = {orjson.dumps(spec, option=orjson.OPT_SORT_KEYS): spec for spec in specs}
+        views = dict(zip(unique, await asyncio.gather(
+            *[self.warm(spec, elastic, redis) for spec in unique.values()],
+        )))
+        return [views[orjson.dumps(spec, option=orjson.OPT_SORT_KEYS)] for spec in specs]
+
+    async def run(self, elastic: AsyncElasticsearch, redis: Redis):
+        """
+        Прогрев кэша: первые страницы фильмов по жанрам, справочник жанров, популярные фильмы и востребованные запросы.
+
+        Args:
+            elastic: Соединение с Elasticsearch
+            redis: Соединение с Redis
+        """
+        if not catalog.genres.loaded:
+            await catalog.genres.load(elastic)
+        film_lists = get_film_list_specs()
+        genre_list = {
+            'service': GenreListService.__name__,
+            'index': 'genres',
+            'model': 'GenreList',
+            'page_number': 1,
+            'page_size': CONFIG.warmup.page_size,
+        }
+        pages = await self.warm_all(film_lists + [genre_list] + await get_hot_specs(redis), elastic, redis)
+        films = get_film_specs(pages[:len(CONFIG.warmup.sorts) * CONFIG.warmup.pages])
+        await self.warm_all(films, elastic, redis)
+        logging.info('Кэш прогрет: {0} запросов.'.format(len(pages) + len(films)))
+
+    def start(self, elastic: AsyncElasticsearch, redis: Redis):
+        """
+        Запуск прогрева кэша в фоне, если он включён.
+
+        Args:
+            elastic: Соединение с Elasticsearch
+            redis: Соединение с Redis
+        """
+        if CONFIG.warmup.enabled:
+            self.task = asyncio.create_task(self.run(elastic, redis))
+
+    async def stop(self):
+        """Остановка прогрева кэша, если он ещё выполняется."""
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+
+
+warmer = CacheWarmer()
@@ -14,4 +14,5 @@ pytest_plugins = [
     'functional.src.fixtures.fixture_elastic',
     'functional.src.fixtures.fixture_redis',
     'functional.src.fixtures.fixture_session',
+    'functional.src.fixtures.fixture_proxy',
 ]
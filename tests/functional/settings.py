@@ -28,6 +28,10 @@ class ElasticConfig(TestDBConfig):
     """Класс с настройками для подключения к Elasticsearch."""
 
 
+class ToxiproxyConfig(TestDBConfig):
+    """Класс с настройками для подключения к API Toxiproxy, через который сервис обращается к Elasticsearch."""
+
+
 class UrlPath(BaseModel):
     """Класс для предоставления URL-адреса сервиса."""
 
@@ -69,6 +73,7 @@ class QueryParams(BaseModel):
     filter: Optional[str] = Field(alias='filter[genre]')
     page_number: Optional[int] = Field(default=1, alias='page[number]')
     page_size: Optional[int] = Field(default=50, alias='page[size]')
+    cursor: Optional[str] = Field(alias='page[cursor]')
     query: Optional[str]
     sort: Optional[str]
 
@@ -85,6 +90,7 @@ class TestMainSettings(BaseSettings):
     url: UrlPath = Field(default_factory=UrlPath)
     elastic: TestDBConfig = Field(default=ElasticConfig(host='127.0.0.1', port=9200))
     redis: TestDBConfig = Field(default=RedisConfig(host='127.0.0.1', port=6379))
+    toxiproxy: TestDBConfig = Field(default=ToxiproxyConfig(host='127.0.0.1', port=8474))
 
 
 TEST_CONFIG = TestMainSettings(_env_file='.env', _env_nested_delimiter='_')
@@ -0,0 +1,59 @@
+import asyncio
+import http
+import uuid
+from typing import AsyncGenerator, Callable
+
+import aiohttp
+import pytest
+import pytest_asyncio
+
+from settings import TEST_CONFIG
+
+ELASTIC_PROXY = 'elastic'
+RECOVERY_TIMEOUT = 30
+
+
+async def set_proxy_enabled(name: str, enabled: bool):
+    """
+    Включение или отключение прокси Toxiproxy: отключённый прокси разрывает и не принимает соединения.
+
+    Args:
+        name: Название прокси
+        enabled: Должен ли прокси пропускать соединения
+    """
+    url = 'http://{host}:{port}/proxies/{name}'.format(name=name, **TEST_CONFIG.toxiproxy.dict())
+    async with aiohttp.ClientSession() as session:
+        async with session.post(url, json={'enabled': enabled}) as response:
+            response.raise_for_status()
+
+
+@pytest_asyncio.fixture
+async def elastic_outage(make_get_request: Callable) -> AsyncGenerator[None, None]:
+    """
+    Фикстура для разрыва соединения сервиса с Elasticsearch на время теста.
+
+    После теста соединение восстанавливается, и фикстура ждёт, пока сервис снова начнёт отвечать,
+    чтобы открытый предохранитель не повлиял на следующие тесты.
+    Если API Toxiproxy недоступно, например сервис работает с Elasticsearch напрямую, тест пропускается.
+
+    Args:
+        make_get_request: Фикстура, выполняющая HTTP-запрос
+
+    Yields:
+        None: Сервис без доступа к Elasticsearch
+    """
+    try:
+        await set_proxy_enabled(ELASTIC_PROXY, enabled=False)
+    except aiohttp.ClientConnectionError:
+        pytest.skip('API Toxiproxy недоступно: сервис работает с Elasticsearch без прокси')
+    try:
+        yield
+    finally:
+        await set_proxy_enabled(ELASTIC_PROXY, enabled=True)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + RECOVERY_TIMEOUT
+        while loop.time() < deadline:
+            response = await make_get_request('/films/search', query=str(uuid.uuid4()))
+            if response.status == http.HTTPStatus.OK:
+                break
+            await asyncio.sleep(1)
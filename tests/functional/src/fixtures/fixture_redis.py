@@ -1,34 +1,46 @@
-from typing import AsyncGenerator, Callable, Optional
+from typing import AsyncGenerator, Callable, Dict, Optional
 from uuid import UUID
 
-import aioredis
 import pytest
 import pytest_asyncio
-
+from elasticsearch import AsyncElasticsearch
+from redis.asyncio import Redis
+
+from models.film import Film, FilmList
+from models.genre import Genre, GenreList
+from models.person import Person, PersonList
+from services.base import DEPENDENT_INDICES, BaseService
+from services.cache import GENERATION_KEY
+from services.filters import FilterGenreFilms, QuerySearch
+from services.list import ListService
+from services.retrieve import RetrieveService
 from settings import TEST_CONFIG, QueryParams
 
+MODELS = {
+    'movies': (Film, FilmList),
+    'persons': (Person, PersonList),
+    'genres': (Genre, GenreList),
+}
+
 
 @pytest_asyncio.fixture(scope='session')
-async def redis() -> AsyncGenerator[aioredis.Redis, None]:
+async def redis() -> AsyncGenerator[Redis, None]:
     """
     Фикстура для подключения к Redis и очищения кэша данных после тестов.
 
     Yields:
-        aioredis.Redis: Объект для асинхронной работы с Redis
+        Redis: Объект для асинхронной работы с Redis
     """
-    redis = await aioredis.create_redis_pool(
-        tuple(TEST_CONFIG.redis.dict().values()), minsize=10, maxsize=20,
-    )
+    redis = Redis(**TEST_CONFIG.redis.dict())
     try:
         yield redis
     finally:
         await redis.flushall()
-        redis.close()
-        await redis.wait_closed()
+        await redis.close()
 
 
 @pytest_asyncio.fixture(scope='session', autouse=True)
-async def clear_cache(redis: aioredis.Redis):
+async def clear_cache(redis: Redis):
     """
     Фикстура для очищения кэша перед запуском тестов.
 
@@ -38,40 +50,69 @@ async def clear_cache(redis: aioredis.Redis):
     await redis.flushall()
 
 
-def get_redis_key(index: str, id: Optional[UUID], **kwargs) -> str:
+def get_service(connections: Dict, index: str, id: Optional[UUID], **kwargs) -> BaseService:
     """
-    Получение ключа от данных в кэше Redis.
+    Создание сервиса так же, как при обработке запроса, чтобы получить ключ от его данных в кэше.
+
+    Сервис только строит ключ и к базам данных не обращается.
 
     Args:
+        connections: Клиенты Elasticsearch и Redis
         index: Название индекса Elasticsearch
         id: ID данных
         kwargs: Именованные параметры запроса в URL-адресе
 
     Returns:
-        str: Ключ от данных в Redis
+        BaseService: Сервис для получения представления данных кинотеатра
     """
-    params = [
-        f'{field}::{value}' for field, value in QueryParams(**kwargs).dict().items()
-    ]
+    detail_model, list_model = MODELS[index]
     if id:
-        return '{index}::id::{id}'.format(index=index, id=id)
-    return '{index}::{params}'.format(index=index, params='::'.join(params))
+        return RetrieveService(index=index, model=detail_model, id=id, **connections)
+    params = QueryParams(**kwargs)
+    return ListService(
+        index=index, model=list_model,
+        filter=FilterGenreFilms(genre_id=params.filter),
+        query=QuerySearch(q_string=params.query),
+        page_number=params.page_number, page_size=params.page_size, sort=params.sort,
+        **connections,
+    )
 
 
 @pytest.fixture(scope='session')
-def check_cache(redis: aioredis.Redis) -> Callable:
+def make_cache_key(redis: Redis, elastic: AsyncElasticsearch) -> Callable:
+    """
+    Фикстура с вложенной функцией для получения ключа от данных в кэше с текущим поколением данных индексов.
+
+    Args:
+        redis: Фикстура с клиентом Redis
+        elastic: Фикстура с клиентом Elasticsearch
+
+    Returns:
+        Callable: Фикстура-функция, чтобы получить ключ от данных в кэше Redis
+    """
+    async def inner(index: str, id: Optional[UUID] = None, **kwargs) -> str:
+        counters = await redis.mget(
+            *[GENERATION_KEY.format(index=dependency) for dependency in DEPENDENT_INDICES[index]],
+        )
+        return '{key}::g{generation}'.format(
+            key=get_service({'elastic': elastic, 'redis': redis}, index, id, **kwargs).redis_key,
+            generation='.'.join(str(int(counter or 0)) for counter in counters),
+        )
+    return inner
+
+
+@pytest.fixture(scope='session')
+def check_cache(redis: Redis, make_cache_key: Callable) -> Callable:
     """
     Фикстура с вложенной функцией для получения данных из кэша.
 
     Args:
         redis: Фикстура с клиентом Redis
+        make_cache_key: Фикстура, получающая ключ от данных в кэше
 
     Returns:
         Callable: Фикстура-функция, чтобы получить данные из кэша Redis
     """
     async def inner(index: str, id: Optional[UUID] = None, **kwargs) -> bytes:
-        cache = await redis.get(
-            key=get_redis_key(index=index, id=id, **kwargs),
-        )
-        return cache
+        return await redis.get(key=await make_cache_key(index, id, **kwargs))
     return inner
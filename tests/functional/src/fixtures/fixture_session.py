@@ -1,4 +1,4 @@
-from typing import AsyncGenerator, Callable, Dict, List, Union
+from typing import AsyncGenerator, Callable, Dict, List, Optional, Union
 
 import aiohttp
 import jwt
@@ -74,13 +74,14 @@ def make_get_request(session: aiohttp.ClientSession) -> Callable:
     Returns:
         Callable: Фикстура-функция, чтобы получить данных от HTTP-сервера
     """
-    async def inner(path: str, **params) -> HttpResponse:
+    async def inner(path: str, headers: Optional[Dict] = None, **params) -> HttpResponse:
         async with session.get(
             url=get_url_path(path=path),
             params=get_query_params(**params),
+            headers=headers,
         ) as response:
             return HttpResponse(
-                body=await response.json(),
+                body=await response.json() if response.content_type == 'application/json' else {},
                 headers=response.headers,
                 status=response.status,
             )
@@ -0,0 +1,77 @@
+import asyncio
+import http
+import time
+from typing import Callable
+
+import jwt
+import pytest
+
+from settings import TEST_CONFIG
+
+TOKEN_LIFETIME = 2
+
+
+@pytest.mark.parametrize(
+    'authorization',
+    [
+        'Bearer',
+        'Bearer   ',
+        'Basic dXNlcjpwYXNzd29yZA==',
+        'token',
+    ],
+)
+@pytest.mark.asyncio
+async def test_malformed_authorization(
+    authorization: str,  # args
+    make_get_request: Callable,  # fixtures
+):
+    """
+    Тестирование ответа 401 на заголовок Authorization без токена доступа Bearer.
+
+    Args:
+        authorization: Значение заголовка Authorization
+        make_get_request: Фикстура, выполняющая HTTP-запрос
+    """
+    response = await make_get_request('/persons', headers={'Authorization': authorization})
+
+    assert response.status == http.HTTPStatus.UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_expired_token(
+    make_get_request: Callable,  # fixtures
+):
+    """
+    Тестирование ответа 401 на токен доступа с истёкшим сроком.
+
+    Args:
+        make_get_request: Фикстура, выполняющая HTTP-запрос
+    """
+    token = jwt.encode({'exp': int(time.time()) - 1}, TEST_CONFIG.secret_key, algorithm='HS256')
+
+    response = await make_get_request('/persons', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status == http.HTTPStatus.UNAUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_cached_token_expires(
+    make_get_request: Callable,  # fixtures
+):
+    """
+    Тестирование того, что проверенный токен доступа из кэша перестаёт действовать по истечении его срока.
+
+    Args:
+        make_get_request: Фикстура, выполняющая HTTP-запрос
+    """
+    token = jwt.encode({'exp': int(time.time()) + TOKEN_LIFETIME}, TEST_CONFIG.secret_key, algorithm='HS256')
+    headers = {'Authorization': f'Bearer {token}'}
+
+    verified = await make_get_request('/persons', headers=headers)
+    cached = await make_get_request('/persons', headers=headers)
+    await asyncio.sleep(TOKEN_LIFETIME + 1)
+    expired = await make_get_request('/persons', headers=headers)
+
+    assert verified.status == http.HTTPStatus.OK
+    assert cached.status == http.HTTPStatus.OK
+    assert expired.status == http.HTTPStatus.UNAUTHORIZED
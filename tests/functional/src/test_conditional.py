@@ -0,0 +1,95 @@
+import http
+import uuid
+from typing import Callable
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    'path, index',
+    [
+        ('/films/{id}', 'movies'),
+        ('/persons/{id}', 'persons'),
+        ('/genres/{id}', 'genres'),
+    ],
+)
+@pytest.mark.asyncio
+async def test_not_modified(
+    path: str, index: str,  # args
+    extract_data: Callable, make_get_request: Callable,  # fixtures
+):
+    """
+    Тестирование ответа 304 на условный запрос с ETag уже полученного представления.
+
+    Args:
+        path: Путь к URL-ресурсу
+        index: Название индекса Elasticsearch
+        extract_data: Фикстура, извлекающая данные из БД
+        make_get_request: Фикстура, выполняющая HTTP-запрос
+    """
+    expected = await extract_data(index)
+
+    response = await make_get_request(path.format(id=expected['id']))
+    conditional = await make_get_request(
+        path.format(id=expected['id']), headers={'If-None-Match': response.headers['ETag']},
+    )
+
+    assert response.status == http.HTTPStatus.OK
+    assert conditional.status == http.HTTPStatus.NOT_MODIFIED
+    assert conditional.headers['ETag'] == response.headers['ETag']
+
+
+@pytest.mark.parametrize(
+    'path',
+    [
+        '/films/{id}',
+        '/persons/{id}',
+        '/genres/{id}',
+    ],
+)
+@pytest.mark.asyncio
+async def test_any_etag_not_found(
+    path: str,  # args
+    make_get_request: Callable,  # fixtures
+):
+    """
+    Тестирование ответа 404 на условный запрос `If-None-Match: *` к несуществующему объекту.
+
+    Args:
+        path: Путь к URL-ресурсу
+        make_get_request: Фикстура, выполняющая HTTP-запрос
+    """
+    response = await make_get_request(path.format(id=uuid.uuid4()), headers={'If-None-Match': '*'})
+
+    assert response.status == http.HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize(
+    'path, index, cache_scope',
+    [
+        ('/films', 'movies', 'public'),
+        ('/films/{id}', 'movies', 'private'),
+        ('/persons/{id}', 'persons', 'private'),
+    ],
+)
+@pytest.mark.asyncio
+async def test_cache_scope(
+    path: str, index: str, cache_scope: str,  # args
+    extract_data: Callable, make_get_request: Callable,  # fixtures
+):
+    """
+    Тестирование хранения в общих кэшах только ответов ресурсов, доступных без токена.
+
+    Args:
+        path: Путь к URL-ресурсу
+        index: Название индекса Elasticsearch
+        cache_scope: Ожидаемая область хранения ответа в Cache-Control
+        extract_data: Фикстура, извлекающая данные из БД
+        make_get_request: Фикстура, выполняющая HTTP-запрос
+    """
+    expected = await extract_data(index)
+
+    response = await make_get_request(path.format(id=expected['id']))
+
+    assert response.status == http.HTTPStatus.OK
+    assert response.headers['Cache-Control'].startswith('{0},'.format(cache_scope))
@@ -0,0 +1,69 @@
+import base64
+import http
+import json
+from typing import Callable
+
+import pytest
+
+from conftest import MOVIES_COUNT, PERSONS_COUNT
+from settings import MAX_PAGE_SIZE
+
+
+@pytest.mark.parametrize(
+    'path, total_items',
+    [
+        ('/films', MOVIES_COUNT),
+        ('/persons', PERSONS_COUNT),
+    ],
+)
+@pytest.mark.asyncio
+async def test_cursor_walk(
+    path: str, total_items: int,  # args
+    make_get_request: Callable,  # fixtures
+):
+    """
+    Тестирование обхода всех страниц по курсору из заголовка X-Next-Cursor без пропусков и повторов.
+
+    Args:
+        path: Путь к URL-ресурсу
+        total_items: Общее количество элементов
+        make_get_request: Фикстура, выполняющая HTTP-запрос
+    """
+    ids, cursor = [], ''
+    while cursor is not None:
+        response = await make_get_request(path, page_size=MAX_PAGE_SIZE, cursor=cursor)
+        assert response.status == http.HTTPStatus.OK
+        assert response.headers['Cache-Control'] == 'no-store'
+        ids.extend(item['uuid'] for item in response.body)
+        cursor = response.headers.get('X-Next-Cursor')
+
+    assert len(ids) == total_items
+    assert len(set(ids)) == total_items
+
+
+@pytest.mark.parametrize(
+    'cursor',
+    [
+        'not-a-cursor',
+        base64.urlsafe_b64encode(json.dumps({'after': [], 'pit': None}).encode()).decode(),
+        base64.urlsafe_b64encode(json.dumps({'after': [1], 'pit': None}).encode()).decode(),
+        base64.urlsafe_b64encode(json.dumps({'after': [{'id': 1}, 'id'], 'pit': None}).encode()).decode(),
+        base64.urlsafe_b64encode(json.dumps({'after': [1, 'id'], 'pit': 1}).encode()).decode(),
+        base64.urlsafe_b64encode(json.dumps({'after': ['rating', 'id'], 'pit': None}).encode()).decode(),
+    ],
+)
+@pytest.mark.asyncio
+async def test_bad_cursor(
+    cursor: str,  # args
+    make_get_request: Callable,  # fixtures
+):
+    """
+    Тестирование ответа 400 на повреждённый курсор и курсор со значениями не той длины или типа.
+
+    Args:
+        cursor: Курсор страницы
+        make_get_request: Фикстура, выполняющая HTTP-запрос
+    """
+    response = await make_get_request('/films', sort='-imdb_rating', cursor=cursor)
+
+    assert response.status == http.HTTPStatus.BAD_REQUEST
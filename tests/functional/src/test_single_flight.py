@@ -0,0 +1,84 @@
+import asyncio
+import http
+from typing import Callable
+
+import pytest
+from redis.asyncio import Redis
+
+from db.cache import CacheEntry
+
+PAGE_SIZE = 3
+CONCURRENT_REQUESTS = 10
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses(
+    make_get_request: Callable, check_cache: Callable,  # fixtures
+):
+    """
+    Тестирование одновременных промахов кэша по одному ключу: все запросы получают одни и те же данные.
+
+    Args:
+        make_get_request: Фикстура, выполняющая HTTP-запрос
+        check_cache: Фикстура, проверяющая кэш данных
+    """
+    params = {'page_number': 2, 'page_size': PAGE_SIZE}
+
+    responses = await asyncio.gather(
+        *[make_get_request('/films', **params) for _ in range(CONCURRENT_REQUESTS)],
+    )
+    cache = await check_cache('movies', **params)
+
+    assert {response.status for response in responses} == {http.HTTPStatus.OK}
+    assert all(response.body == responses[0].body for response in responses)
+    assert len(responses[0].body) == PAGE_SIZE
+    assert cache
+
+
+@pytest.mark.asyncio
+async def test_wait_for_lock_owner(
+    redis: Redis, make_get_request: Callable, make_cache_key: Callable,  # fixtures
+):
+    """
+    Тестирование ожидания данных, которые вычисляет другой процесс, захвативший блокировку в Redis.
+
+    Args:
+        redis: Фикстура с клиентом Redis
+        make_get_request: Фикстура, выполняющая HTTP-запрос
+        make_cache_key: Фикстура, получающая ключ от данных в кэше
+    """
+    params = {'page_number': 3, 'page_size': PAGE_SIZE}
+    key = await make_cache_key('movies', **params)
+    await redis.set(f'{key}::lock', 'other', px=5000)
+
+    request = asyncio.create_task(make_get_request('/films', **params))
+    await asyncio.sleep(0.5)
+    await redis.set(key, CacheEntry.create(b'[]', expire=60, delta=0).pack('none', min_size=0), ex=60)
+    await redis.delete(f'{key}::lock')
+    response = await request
+
+    assert response.status == http.HTTPStatus.OK
+    assert response.body == []
+
+
+@pytest.mark.asyncio
+async def test_expired_lock(
+    redis: Redis, make_get_request: Callable, make_cache_key: Callable,  # fixtures
+):
+    """
+    Тестирование вычисления данных самим процессом, если блокировка истекла, а данные так и не появились.
+
+    Args:
+        redis: Фикстура с клиентом Redis
+        make_get_request: Фикстура, выполняющая HTTP-запрос
+        make_cache_key: Фикстура, получающая ключ от данных в кэше
+    """
+    params = {'page_number': 4, 'page_size': PAGE_SIZE}
+    key = await make_cache_key('movies', **params)
+    await redis.set(f'{key}::lock', 'other', px=500)
+
+    response = await make_get_request('/films', **params)
+
+    assert response.status == http.HTTPStatus.OK
+    assert len(response.body) == PAGE_SIZE
+    assert await redis.get(key)
@@ -0,0 +1,39 @@
+import asyncio
+import http
+import time
+from typing import Callable
+
+import pytest
+from redis.asyncio import Redis
+
+from db.cache import CacheEntry
+
+PAGE_SIZE = 3
+REFRESH_TIME = 1
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate(
+    redis: Redis, make_get_request: Callable, make_cache_key: Callable,  # fixtures
+):
+    """
+    Тестирование ответа устаревшими данными из кэша и их обновления в фоне.
+
+    Args:
+        redis: Фикстура с клиентом Redis
+        make_get_request: Фикстура, выполняющая HTTP-запрос
+        make_cache_key: Фикстура, получающая ключ от данных в кэше
+    """
+    params = {'page_number': 5, 'page_size': PAGE_SIZE}
+    key = await make_cache_key('movies', **params)
+    await redis.set(key, CacheEntry.create(b'[]', expire=-1, delta=0).pack('none', min_size=0), ex=60)
+
+    stale = await make_get_request('/films', **params)
+    await asyncio.sleep(REFRESH_TIME)
+    fresh = await make_get_request('/films', **params)
+    entry = CacheEntry.unpack(await redis.get(key))
+
+    assert stale.status == http.HTTPStatus.OK
+    assert stale.body == []
+    assert len(fresh.body) == PAGE_SIZE
+    assert entry and entry.stale_at > time.time()
@@ -0,0 +1,34 @@
+import http
+import uuid
+from typing import Callable
+
+import aiohttp
+import pytest
+
+from settings import TEST_CONFIG
+
+REQUESTS_COUNT = 5
+
+
+@pytest.mark.asyncio
+async def test_backend_unavailable(
+    elastic_outage: None, session: aiohttp.ClientSession, make_get_request: Callable,  # fixtures
+):
+    """
+    Тестирование ответа 503 с заголовком Retry-After, пока Elasticsearch недоступен.
+
+    Несколько запросов подряд открывают предохранитель, и дальше запросы отклоняются, не дожидаясь повторов.
+
+    Args:
+        elastic_outage: Фикстура, разрывающая соединение с Elasticsearch
+        session: Фикстура с HTTP-клиентом
+        make_get_request: Фикстура, выполняющая HTTP-запрос
+    """
+    for _ in range(REQUESTS_COUNT):
+        response = await make_get_request('/films/search', query=str(uuid.uuid4()))
+
+        assert response.status == http.HTTPStatus.SERVICE_UNAVAILABLE
+        assert int(response.headers['Retry-After']) >= 1
+
+    async with session.get('{protocol}{domain}{port}/metrics'.format(**TEST_CONFIG.url.dict())) as metrics:
+        assert 'circuit_breaker_open{backend="elastic"} 1.0' in await metrics.text()
@@ -63,9 +63,12 @@ class ElasticDocsFactory:
         Yields:
             Person: Документ персоны
         """
-        for person in sum([list(movie.actors), list(movie.writers)], []):
-            yield Person(id=person.id, full_name=person.name)
-        yield Person(id=self.fake.uuid4(), full_name=movie.director[0])
+        films = {'film_ids': [movie.id], 'films_count': 1}
+        for actor in movie.actors:
+            yield Person(id=actor.id, full_name=actor.name, role='actor', **films)
+        for writer in movie.writers:
+            yield Person(id=writer.id, full_name=writer.name, role='writer', **films)
+        yield Person(id=self.fake.uuid4(), full_name=movie.director[0], role='director', **films)
 
     def get_genres(self, genres_names: List[str]) -> Iterator[Genre]:
         """
@@ -1,4 +1,4 @@
-from elasticsearch_dsl import Keyword, Text
+from elasticsearch_dsl import Integer, Keyword, Text
 
 from testdata.schemas.base import Mappings, Settings
 
@@ -7,6 +7,9 @@ class Person(Mappings):
     """Класс структуры документа с данными о персоне."""
 
     full_name = Text(analyzer='ru_en', fields={'raw': Keyword()})
+    role = Keyword()
+    film_ids = Keyword()
+    films_count = Integer()
 
     class Index(Settings):
         name = 'persons'